@@ -1,14 +1,42 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
 from fastapi import FastAPI, HTTPException, status
+from pydantic import BaseModel
 
-from bam_core.utils.phone import (
-    format_phone_number,
-    is_international_phone_number,
-)
+from bam_core.lib.google import AsyncGoogleMaps
+from bam_core.lib.nyc_planning_labs import AsyncNycPlanningLabs
+from bam_core.utils.phone import analyze_phone_number
 from bam_core.utils.email import format_email
-from bam_core.utils.geo import format_address
-from bam_app.settings import APIKEY
+from bam_core.utils.geo import format_address_async
+from bam_app.metrics import (
+    metrics_middleware,
+    metrics_response,
+    observe_upstream,
+    upstream_event_hooks,
+)
+from bam_app.settings import (
+    APIKEY,
+    CLEAN_RECORDS_CONCURRENCY,
+    CLEAN_RECORDS_MAX_BATCH_SIZE,
+)
+
+# pooled http clients, shared by all requests in this process
+gmaps = AsyncGoogleMaps(event_hooks=upstream_event_hooks())
+nycpl = AsyncNycPlanningLabs(event_hooks=upstream_event_hooks())
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await gmaps.aclose()
+    await nycpl.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(metrics_middleware)
 
 
 # apikey authentication
@@ -19,8 +47,72 @@ def check_api_key(apikey: str):
         )
 
 
+def _clean_phone(phone: Optional[str]) -> Dict[str, Any]:
+    if phone and phone != "null":
+        phone_info = analyze_phone_number(phone)
+        return {
+            "phone": phone_info.formatted or phone,
+            "phone_is_invalid": not phone_info.is_valid,
+            "phone_is_intl": phone_info.is_intl,
+        }
+    return {"phone": "", "phone_is_invalid": True, "phone_is_intl": False}
+
+
+async def _clean_email(
+    email: Optional[str], dns_check: bool
+) -> Dict[str, Any]:
+    if email and email != "null":
+        if dns_check:
+            # email-validator's dns lookups are blocking
+            start = time.perf_counter()
+            email_info = await asyncio.to_thread(
+                format_email, email, dns_check=dns_check
+            )
+            observe_upstream("dns_email_check", start)
+        else:
+            email_info = format_email(email, dns_check=dns_check)
+        return {
+            "email": email_info["email"],
+            "email_error": email_info["error"] or "",
+        }
+    return {"email": "", "email_error": "No email address provided"}
+
+
+async def _clean_address(
+    address: Optional[str], city_state: str, zip_code: str
+) -> Dict[str, Any]:
+    if not address:
+        return {}
+    return await format_address_async(
+        address=address,
+        city_state=city_state,
+        zipcode=zip_code,
+        gmaps=gmaps,
+        nycpl=nycpl,
+    )
+
+
+async def _clean_record(
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    dns_check: bool = False,
+    address: Optional[str] = None,
+    city_state: str = "",
+    zip_code: str = "",
+) -> Dict[str, Any]:
+    # validate the email and mailing address concurrently
+    email_response, address_response = await asyncio.gather(
+        _clean_email(email, dns_check),
+        _clean_address(address, city_state, zip_code),
+    )
+    response = _clean_phone(phone)
+    response.update(email_response)
+    response.update(address_response)
+    return response
+
+
 @app.get("/clean-record")
-def clean_record(
+async def clean_record(
     apikey: str,
     phone: str = None,
     email: str = None,
@@ -34,40 +126,58 @@ def clean_record(
     :return: The formatted phone number
     """
     check_api_key(apikey)
-    response = {}
+    return await _clean_record(
+        phone, email, dns_check, address, city_state, zip_code
+    )
 
-    # validate phone number
-    if phone and phone != "null":
-        valid_phone = format_phone_number(phone)
-        if not valid_phone:
-            response["phone"] = phone
-            response["phone_is_invalid"] = True
-            response["phone_is_intl"] = False
-        else:
-            response["phone"] = valid_phone
-            response["phone_is_invalid"] = False
-            response["phone_is_intl"] = is_international_phone_number(phone)
-    else:
-        response["phone"] = ""
-        response["phone_is_invalid"] = True
-        response["phone_is_intl"] = False
-
-    # validate email address
-    if email and email != "null":
-        email_info = format_email(email, dns_check=dns_check)
-        response["email"] = email_info["email"]
-        response["email_error"] = email_info["error"] or ""
-    else:
-        response["email"] = ""
-        response["email_error"] = "No email address provided"
-
-    # validate mailing address
-    if address:
-        address_response = format_address(
-            address=address, city_state=city_state, zipcode=zip_code
+
+class CleanRecordInput(BaseModel):
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    dns_check: bool = False
+    address: Optional[str] = None
+    city_state: str = ""
+    zip_code: str = ""
+
+
+@app.post("/clean-records")
+async def clean_records(apikey: str, records: List[CleanRecordInput]):
+    """
+    Clean a batch of records, with the same fields as /clean-record
+    :param records: The list of records to clean
+    :return: The list of cleaned records, in the same order
+    """
+    check_api_key(apikey)
+    if len(records) > CLEAN_RECORDS_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batches are limited to {CLEAN_RECORDS_MAX_BATCH_SIZE} records",
         )
-        response.update(address_response)
-    return response
+
+    # only clean identical records once
+    unique_records = {}
+    for record in records:
+        unique_records.setdefault(tuple(record.model_dump().values()), record)
+
+    semaphore = asyncio.Semaphore(CLEAN_RECORDS_CONCURRENCY)
+
+    async def clean(record: CleanRecordInput) -> Dict[str, Any]:
+        async with semaphore:
+            return await _clean_record(**record.model_dump())
+
+    results = await asyncio.gather(
+        *(clean(record) for record in unique_records.values())
+    )
+    cleaned = dict(zip(unique_records.keys(), results))
+    return [cleaned[tuple(record.model_dump().values())] for record in records]
+
+
+@app.get("/metrics")
+def metrics():
+    """
+    :return: Latency and cache metrics in the Prometheus text format
+    """
+    return metrics_response()
 
 
 @app.get("/yo")
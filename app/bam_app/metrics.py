@@ -0,0 +1,164 @@
+"""
+Prometheus metrics for the API: request latency per endpoint, latency of
+each upstream dependency and hit rates of the shared caches.
+
+When running under multiple gunicorn workers, set PROMETHEUS_MULTIPROC_DIR
+to an empty directory so every worker's metrics are aggregated on /metrics.
+"""
+
+import os
+import time
+from typing import Callable, Dict, List
+
+import httpx
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import REGISTRY
+
+from bam_core.utils import geo, email
+from bam_core.utils.cache import SqliteCache
+
+# buckets which cover both cache hits and slow upstream calls
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "bam_http_request_duration_seconds",
+    "Latency of requests to the API",
+    ["method", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "bam_upstream_request_duration_seconds",
+    "Latency of calls to upstream dependencies",
+    ["upstream", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# upstream names by url path
+UPSTREAMS = {
+    "/maps/api/place/autocomplete/json": "places",
+    "/maps/api/geocode/json": "geocode",
+    "/v1:validateAddress": "address_validation",
+    "/v2/search": "geosearch",
+}
+
+
+class CacheCollector(object):
+    """
+    Report the statistics of the shared caches, which are already
+    aggregated across workers
+    """
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "bam_cache_hits", "Cache hits", labels=["cache"]
+        )
+        misses = CounterMetricFamily(
+            "bam_cache_misses", "Cache misses", labels=["cache"]
+        )
+        size = GaugeMetricFamily(
+            "bam_cache_size", "Entries in the cache", labels=["cache"]
+        )
+        hit_rate = GaugeMetricFamily(
+            "bam_cache_hit_rate", "Cache hit rate", labels=["cache"]
+        )
+        for name, cache in get_caches().items():
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["size"])
+            hit_rate.add_metric([name], stats["hit_rate"])
+        yield from (hits, misses, size, hit_rate)
+
+
+def get_caches() -> Dict[str, SqliteCache]:
+    caches = {
+        "geo": geo.GEO_CACHE,
+        "email_domains": email.DOMAIN_CHECKER.cache,
+    }
+    return {name: cache for name, cache in caches.items() if cache is not None}
+
+
+def get_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+async def _start_upstream_timer(request: httpx.Request) -> None:
+    request.extensions["bam_start"] = time.perf_counter()
+
+
+async def _observe_upstream(response: httpx.Response) -> None:
+    request = response.request
+    start = request.extensions.get("bam_start")
+    if start is None:
+        return
+    upstream = UPSTREAMS.get(request.url.path, request.url.path)
+    UPSTREAM_LATENCY.labels(upstream, response.status_code).observe(
+        time.perf_counter() - start
+    )
+
+
+def upstream_event_hooks() -> Dict[str, List[Callable]]:
+    """
+    httpx event hooks which record the latency of upstream calls
+    """
+    return {
+        "request": [_start_upstream_timer],
+        "response": [_observe_upstream],
+    }
+
+
+def observe_upstream(upstream: str, start: float, status: str = "ok") -> None:
+    """
+    Record the latency of an upstream call which doesn't go through httpx
+    (eg: dns lookups)
+    """
+    UPSTREAM_LATENCY.labels(upstream, status).observe(
+        time.perf_counter() - start
+    )
+
+
+async def metrics_middleware(request: Request, call_next) -> Response:
+    start = time.perf_counter()
+    response = await call_next(request)
+    # use the route's path template to keep label cardinality bounded
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    REQUEST_LATENCY.labels(
+        request.method, endpoint, response.status_code
+    ).observe(time.perf_counter() - start)
+    return response
+
+
+def metrics_response() -> Response:
+    registry = get_registry()
+    output = generate_latest(registry)
+    cache_registry = CollectorRegistry()
+    cache_registry.register(CacheCollector())
+    output += generate_latest(cache_registry)
+    return Response(content=output, media_type=CONTENT_TYPE_LATEST)
@@ -1,3 +1,9 @@
 import os
 
 APIKEY = os.getenv("BAM_APIKEY", "bam")
+
+# the number of records /clean-records cleans at once
+CLEAN_RECORDS_CONCURRENCY = int(os.getenv("BAM_CLEAN_RECORDS_CONCURRENCY", 10))
+CLEAN_RECORDS_MAX_BATCH_SIZE = int(
+    os.getenv("BAM_CLEAN_RECORDS_MAX_BATCH_SIZE", 1000)
+)
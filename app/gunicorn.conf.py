@@ -0,0 +1,34 @@
+# Production settings for running the API with multiple worker processes:
+#   gunicorn -c gunicorn.conf.py bam_app.main:app
+# Workers share the geocoding and email domain caches through the SQLite
+# file at BAM_CACHE_PATH, so it should be on a local disk.
+import os
+import multiprocessing
+
+bind = os.getenv("BAM_BIND", "0.0.0.0:3030")
+workers = int(os.getenv("BAM_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("BAM_WORKER_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+# restart workers periodically to cap memory growth
+max_requests = int(os.getenv("BAM_WORKER_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+
+def on_starting(server):
+    # clear metrics left over from a previous run in multiprocess mode
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for filename in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, filename))
+
+
+def child_exit(server, worker):
+    # clean up the metrics of exited workers in multiprocess mode
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+from load_test import get_parser as get_load_test_parser, run, report
+
+# Measure how throughput scales with the number of gunicorn workers by
+# driving the API with load_test.py while the Google Maps and NYC
+# Planning Labs APIs are replaced by upstream_stub.py, eg:
+#   python scripts/benchmark_workers.py --workers 1 2 4 --latency 0.05
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(SCRIPTS_DIR)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark API throughput per number of workers"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="The numbers of workers to benchmark",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.05,
+        help="The latency of each stubbed upstream API call, in seconds",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=50,
+        help="The number of concurrent requests",
+    )
+    parser.add_argument(
+        "-n",
+        "--num-requests",
+        type=int,
+        default=1000,
+        help="The number of requests per run",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="Enable the shared geocoding cache (addresses still repeat "
+        "unless --unique-addresses is set)",
+    )
+    parser.add_argument(
+        "--unique-addresses",
+        action="store_true",
+        default=False,
+        help="Use a different address for every request",
+    )
+    parser.add_argument(
+        "--port", type=int, default=3050, help="The port for the API"
+    )
+    parser.add_argument(
+        "--stub-port", type=int, default=3060, help="The port for the stub"
+    )
+    return parser
+
+
+def wait_for(url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main():
+    args = get_parser().parse_args()
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.port}"
+    stub = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "upstream_stub:app",
+            "--port",
+            str(args.stub_port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=SCRIPTS_DIR,
+        env={**os.environ, "BAM_STUB_LATENCY": str(args.latency)},
+    )
+    results = []
+    try:
+        wait_for(f"{stub_url}/docs")
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                env = {
+                    **os.environ,
+                    "BAM_WORKERS": str(workers),
+                    "BAM_BIND": f"127.0.0.1:{args.port}",
+                    "BAM_GOOGLE_MAPS_API_KEY": "AIzaBenchmark",
+                    "BAM_GOOGLE_MAPS_BASE_URL": stub_url,
+                    "BAM_GOOGLE_ADDRESS_VALIDATION_URL": f"{stub_url}/v1:validateAddress",
+                    "BAM_NYC_PLANNING_LABS_BASE_URL": f"{stub_url}/v2",
+                    "BAM_CACHE_PATH": os.path.join(cache_dir, "cache.sqlite"),
+                    "BAM_GEO_CACHE_TTL": "3600" if args.cache else "0",
+                }
+                api = subprocess.Popen(
+                    [
+                        sys.executable,
+                        "-m",
+                        "gunicorn",
+                        "-c",
+                        os.path.join(APP_DIR, "gunicorn.conf.py"),
+                        "--access-logfile",
+                        "/dev/null",
+                        "bam_app.main:app",
+                    ],
+                    cwd=APP_DIR,
+                    env=env,
+                )
+                try:
+                    wait_for(f"{api_url}/yo")
+                    load_test_args = get_load_test_parser().parse_args(
+                        [
+                            "--url",
+                            api_url,
+                            "--apikey",
+                            os.getenv("BAM_APIKEY", "bam"),
+                            "--concurrency",
+                            str(args.concurrency),
+                            "--num-requests",
+                            str(args.num_requests),
+                        ]
+                        + (
+                            ["--unique-addresses"]
+                            if args.unique_addresses
+                            else []
+                        )
+                    )
+                    print(f"{workers} worker(s):")
+                    stats = asyncio.run(run(load_test_args))
+                    report(stats)
+                    results.append((workers, stats))
+                finally:
+                    stop(api)
+    finally:
+        stop(stub)
+
+    if not results:
+        return
+    baseline = results[0][1]["throughput"]
+    print("workers | req/s  | req/s per worker | scaling")
+    for workers, stats in results:
+        print(
+            f"{workers:>7} | {stats['throughput']:6.1f}"
+            f" | {stats['throughput'] / workers:16.1f}"
+            f" | {stats['throughput'] / baseline:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
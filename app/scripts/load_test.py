@@ -0,0 +1,136 @@
+import time
+import asyncio
+import argparse
+import statistics
+from urllib.parse import urlencode
+
+import httpx
+
+# Fire N concurrent requests at a running instance of the API and report
+# latency percentiles and throughput, eg:
+#   uvicorn bam_app.main:app --port 3030
+#   python scripts/load_test.py -c 50 -n 500
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Load test the /clean-record endpoint"
+    )
+    parser.add_argument(
+        "-u",
+        "--url",
+        default="http://localhost:3030",
+        help="The base url of the API",
+    )
+    parser.add_argument(
+        "-k", "--apikey", default="bam", help="The API key to use"
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=20,
+        help="The number of concurrent requests",
+    )
+    parser.add_argument(
+        "-n",
+        "--num-requests",
+        type=int,
+        default=200,
+        help="The total number of requests to make",
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        default="323 Linden St",
+        help="The address to clean. Pass an empty string to skip lookups.",
+    )
+    parser.add_argument(
+        "--unique-addresses",
+        action="store_true",
+        default=False,
+        help="Use a different address for every request to bypass caches",
+    )
+    parser.add_argument(
+        "--dns-check",
+        action="store_true",
+        default=False,
+        help="Whether to perform a dns check on the email address",
+    )
+    return parser
+
+
+def percentile(latencies: list, pct: float) -> float:
+    latencies = sorted(latencies)
+    i = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+    return latencies[i]
+
+
+async def run(args) -> dict:
+    params = {
+        "apikey": args.apikey,
+        "phone": "626-420-6969",
+        "email": "test@gmail.com",
+        "dns_check": str(args.dns_check).lower(),
+        "address": args.address,
+        "city_state": "Brooklyn, NY",
+        "zip_code": "11237",
+    }
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+
+        async def request(i: int):
+            nonlocal errors
+            address = args.address
+            if args.unique_addresses and address:
+                address = f"{i} {address}"
+            query = urlencode({**params, "address": address})
+            url = f"{args.url}/clean-record?{query}"
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request(i) for i in range(args.num_requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": args.num_requests,
+        "concurrency": args.concurrency,
+        "elapsed": elapsed,
+        "throughput": args.num_requests / elapsed,
+        "p50": percentile(latencies, 50) if latencies else None,
+        "p99": percentile(latencies, 99) if latencies else None,
+        "mean": statistics.mean(latencies) if latencies else None,
+        "errors": errors,
+    }
+
+
+def report(stats: dict) -> None:
+    print(
+        f"{stats['requests']} requests @ concurrency {stats['concurrency']}"
+        f" in {stats['elapsed']:.2f}s ({stats['throughput']:.1f} req/s)"
+    )
+    if stats["p50"] is not None:
+        print(
+            f"p50 {stats['p50'] * 1000:.1f}ms"
+            f" | p99 {stats['p99'] * 1000:.1f}ms"
+            f" | mean {stats['mean'] * 1000:.1f}ms"
+        )
+    print(f"errors: {stats['errors']}")
+
+
+def main():
+    report(asyncio.run(run(get_parser().parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import asyncio
+
+from fastapi import FastAPI, Request
+
+# A local stand-in for the Google Maps and NYC Planning Labs APIs,
+# which responds after a fixed delay, for benchmarking the API without
+# paying for (or being rate limited by) the real services, eg:
+#   BAM_STUB_LATENCY=0.1 uvicorn upstream_stub:app --port 3040
+# then point the API at it with:
+#   BAM_GOOGLE_MAPS_BASE_URL=http://localhost:3040
+#   BAM_GOOGLE_ADDRESS_VALIDATION_URL=http://localhost:3040/v1:validateAddress
+#   BAM_NYC_PLANNING_LABS_BASE_URL=http://localhost:3040/v2
+
+LATENCY = float(os.getenv("BAM_STUB_LATENCY", 0.1))
+
+app = FastAPI()
+
+
+@app.get("/maps/api/place/autocomplete/json")
+async def places_autocomplete(input: str):
+    await asyncio.sleep(LATENCY)
+    return {
+        "status": "OK",
+        "predictions": [
+            {"description": f"{input}, USA", "types": ["premise", "geocode"]}
+        ],
+    }
+
+
+@app.post("/v1:validateAddress")
+async def validate_address(request: Request):
+    body = await request.json()
+    address = body["address"]["addressLines"]
+    if isinstance(address, list):
+        address = " ".join(address)
+    await asyncio.sleep(LATENCY)
+    return {
+        "result": {
+            "verdict": {"validationGranularity": "PREMISE"},
+            "address": {"formattedAddress": address.upper()},
+        }
+    }
+
+
+@app.get("/maps/api/geocode/json")
+async def geocode(address: str):
+    await asyncio.sleep(LATENCY)
+    return {
+        "status": "OK",
+        "results": [
+            {"geometry": {"location": {"lat": 40.7041015, "lng": -73.9163523}}}
+        ],
+    }
+
+
+@app.get("/v2/search")
+async def search(text: str, size: int = 1):
+    await asyncio.sleep(LATENCY)
+    return {
+        "features": [{"properties": {"addendum": {"pad": {"bin": "3076151"}}}}]
+    }
@@ -1,7 +1,7 @@
 from fastapi.testclient import TestClient
 from bam_app.main import app
 from bam_app.settings import APIKEY
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 client = TestClient(app)
 
@@ -20,7 +20,7 @@ def test_clean_record_with_valid_input():
     }
 
 
-@patch("bam_app.main.format_address")
+@patch("bam_app.main.format_address_async", new_callable=AsyncMock)
 def test_clean_record_with_valid_address(mock_format_address):
     mock_format_address.return_value = {
         "cleaned_address": "323 LINDEN ST BROOKLYN NY 11237-5603",
@@ -49,7 +49,7 @@ def test_clean_record_with_valid_address(mock_format_address):
     }
 
 
-@patch("bam_app.main.format_address")
+@patch("bam_app.main.format_address_async", new_callable=AsyncMock)
 def test_clean_record_with_invalid_address(mock_format_address):
     mock_format_address.return_value = {
         "cleaned_address": "",
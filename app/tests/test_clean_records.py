@@ -0,0 +1,66 @@
+from fastapi.testclient import TestClient
+from bam_app.main import app
+from bam_app.settings import APIKEY
+from unittest.mock import AsyncMock, patch
+
+client = TestClient(app)
+
+ADDRESS_RESPONSE = {
+    "cleaned_address": "323 LINDEN ST BROOKLYN NY 11237-5603",
+    "bin": "3076151",
+    "cleaned_address_accuracy": "Building",
+    "plus_code": "87G8M3XP+",
+    "lat": 40.703,
+    "lng": -73.920,
+}
+
+
+@patch("bam_app.main.format_address_async", new_callable=AsyncMock)
+def test_clean_records_in_order_and_deduped(mock_format_address):
+    mock_format_address.return_value = ADDRESS_RESPONSE
+    record = {
+        "phone": "626-420-6969",
+        "email": "test@test.com",
+        "address": "323 Linden St",
+        "city_state": "Brooklyn, NY",
+        "zip_code": "11237",
+    }
+    response = client.post(
+        f"/clean-records?apikey={APIKEY}",
+        json=[record, {"email": "foo @gmail .com"}, record],
+    )
+    assert response.status_code == 200
+    cleaned_record = {
+        "phone": "(626) 420-6969",
+        "phone_is_invalid": False,
+        "phone_is_intl": False,
+        "email": "test@test.com",
+        "email_error": "",
+        **ADDRESS_RESPONSE,
+    }
+    assert response.json() == [
+        cleaned_record,
+        {
+            "phone": "",
+            "phone_is_invalid": True,
+            "phone_is_intl": False,
+            "email": "foo@gmail.com",
+            "email_error": "",
+        },
+        cleaned_record,
+    ]
+    # identical records are only cleaned once
+    assert mock_format_address.await_count == 1
+
+
+def test_clean_records_apikey_invalid():
+    response = client.post("/clean-records?apikey=invalid", json=[])
+    assert response.status_code == 401
+
+
+@patch("bam_app.main.CLEAN_RECORDS_MAX_BATCH_SIZE", 2)
+def test_clean_records_batch_too_large():
+    response = client.post(
+        f"/clean-records?apikey={APIKEY}", json=[{}, {}, {}]
+    )
+    assert response.status_code == 413
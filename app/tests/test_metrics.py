@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from bam_app.main import app
+from bam_app.metrics import upstream_event_hooks
+from bam_app.settings import APIKEY
+from bam_core.utils.cache import SqliteCache
+
+client = TestClient(app)
+
+
+def test_metrics_request_latency(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite"), namespace="geo")
+    cache.set("323 LINDEN ST", {})
+    cache.get("323 LINDEN ST")
+    with patch("bam_core.utils.geo.GEO_CACHE", cache):
+        client.get(f"/clean-record?apikey={APIKEY}&phone=626-420-6969")
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert (
+        'bam_http_request_duration_seconds_count{endpoint="/clean-record",'
+        'method="GET",status="200"}' in response.text
+    )
+    assert 'bam_cache_hit_rate{cache="geo"} 1.0' in response.text
+
+
+def test_metrics_upstream_latency():
+    async def request():
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"results": []})
+        )
+        async with httpx.AsyncClient(
+            transport=transport, event_hooks=upstream_event_hooks()
+        ) as http:
+            await http.get("https://maps.googleapis.com/maps/api/geocode/json")
+
+    asyncio.run(request())
+    response = client.get("/metrics")
+    assert (
+        'bam_upstream_request_duration_seconds_count{status="200",'
+        'upstream="geocode"}' in response.text
+    )
@@ -28,12 +28,12 @@ from bam_core.constants import (
     PHONE_FIELD,
 )
 from bam_core.utils.serde import json_to_obj, obj_to_json
+from bam_core.utils.snapshot_cache import SnapshotCache, SNAPSHOT_DATE_FIELD
 from bam_core.lib.airtable import Airtable
 
 log = logging.getLogger(__name__)
 
 SNAPSHOT_DATE_FORMAT = r"%Y-%m-%d-%H-%M-%S"
-SNAPSHOT_DATE_FIELD = "Snapshot Date"
 
 
 class AnalyzeFulfilledRequests(Function):
@@ -125,41 +125,52 @@ class AnalyzeFulfilledRequests(Function):
         dt = dt.astimezone(ZoneInfo("UTC"))
         return dt.date().isoformat()
 
-    def get_grouped_records(self):
+    def get_cached_grouped_records(self) -> SnapshotCache:
         """
-        Get records from Digital Ocean Space with local caching
+        Get records from Digital Ocean Space, adding new snapshots to a
+        local memory-mapped cache which is indexed by record id
         """
-        grouped_records = defaultdict(list)
         cache_dir = os.path.join(
-            tempfile.gettempdir(), "airtable_snapshots_cache"
+            tempfile.gettempdir(), "airtable_snapshots_index"
         )
-        os.makedirs(cache_dir, exist_ok=True)
+        self.log.info(f"Using cache directory: {cache_dir}")
+        cache = SnapshotCache(cache_dir)
+        for filepath in self.s3.list_keys(
+            "airtable-snapshots/assistance-requests-main/"
+        ):
+            if not filepath.endswith(".json"):
+                continue
+            snapshot_name = os.path.basename(filepath)
+            if cache.has_snapshot(snapshot_name):
+                self.log.debug(f"Using cached snapshot for {filepath}")
+                continue
+            self.log.debug(f"Fetching records from {filepath}")
+            contents = self.s3.get_contents(filepath).decode("utf-8")
+            cache.add_snapshot(
+                snapshot_name,
+                self.get_snapshot_date(filepath),
+                json_to_obj(contents) if contents else [],
+            )
+        cache.save()
+        return cache
 
+    def get_grouped_records(self):
+        """
+        Get records from Digital Ocean Space with optional local caching
+        """
         self.log.info("Fetching snapshots from Digital Ocean Space...")
         if self.use_cache:
-            self.log.info(f"Using cache directory: {cache_dir}")
+            return self.get_cached_grouped_records()
+
+        grouped_records = defaultdict(list)
         for filepath in self.s3.list_keys(
             "airtable-snapshots/assistance-requests-main/"
         ):
             if not filepath.endswith(".json"):
                 continue
 
-            if self.use_cache:
-                cache_file = os.path.join(
-                    cache_dir, os.path.basename(filepath)
-                )
-                if os.path.exists(cache_file):
-                    self.log.debug(f"Using cached file for {filepath}")
-                    with open(cache_file, "r") as f:
-                        contents = f.read()
-                else:
-                    self.log.debug(f"Fetching records from {filepath}")
-                    contents = self.s3.get_contents(filepath).decode("utf-8")
-                    with open(cache_file, "w") as f:
-                        f.write(contents)
-            else:
-                self.log.debug(f"Fetching records from {filepath}")
-                contents = self.s3.get_contents(filepath).decode("utf-8")
+            self.log.debug(f"Fetching records from {filepath}")
+            contents = self.s3.get_contents(filepath).decode("utf-8")
 
             if contents:
                 snapshot_date = self.get_snapshot_date(filepath)
@@ -256,6 +267,10 @@ class AnalyzeFulfilledRequests(Function):
         """
         Get the most recent snapshots for every record
         """
+        # cached snapshots are indexed, so we can read just the last one
+        if isinstance(grouped_records, SnapshotCache):
+            yield from grouped_records.iter_last_snapshots()
+            return
         # iterate through list of snapshots for each record id
         for record_id, group_records in grouped_records.items():
             # get most recent snapshot for this record id
@@ -343,9 +358,9 @@ class AnalyzeFulfilledRequests(Function):
         )
         self.s3.set_public(fp)
         self.log.info(f"Uploaded summary file to Digital Ocean Space: {fp}")
-        self.s3.purge_cdn_cache(self.OUTPUT_FILEPATH)
+        self.s3.queue_cdn_purge(self.OUTPUT_FILEPATH)
         self.log.info(
-            f"Purged CDN cache for summary file: {self.OUTPUT_FILEPATH}"
+            f"Queued CDN cache purge for summary file: {self.OUTPUT_FILEPATH}"
         )
 
     def run(self, params, context):
@@ -80,19 +80,29 @@ class Function(object):
         """
         raise NotImplementedError
 
+    def _run(self, params: Dict[str, Any], context: Dict[str, Any]) -> Any:
+        """
+        Run the function, then purge any files it published from the CDN cache
+        in a single request.
+        """
+        try:
+            return self.run(params, context)
+        finally:
+            self.s3.flush_cdn_purge_queue()
+
     def run_api(self, params: Dict[str, Any]) -> Any:
         """
         The API Handler.
         """
         params = self.params.parse_dict(params)
-        return self.run(params, {})
+        return self._run(params, {})
 
     def run_do(self, event, context) -> Dict[str, Any]:
         """
         The Digital Ocean Function Handler.
         """
         params = self.params.parse_dict(event)
-        output = self.run(params, context)
+        output = self._run(params, context)
         return {"body": output}
 
     def run_cli(self):
@@ -101,7 +111,7 @@ class Function(object):
         """
         self.params.add_cli_arguments(self.parser)
         params = self.params.parse_cli_arguments(self.parser)
-        return self.run(params, {})
+        return self._run(params, {})
 
     @classmethod
     def run_do_functions(cls, event, context, *functions) -> Dict[str, Any]:
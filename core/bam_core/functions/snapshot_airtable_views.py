@@ -5,7 +5,7 @@ from datetime import timedelta, datetime
 
 from bam_core.functions.base import Function
 from bam_core.functions.params import Params, Param
-from bam_core.utils.serde import obj_to_json
+from bam_core.utils.serde import dump_stream
 from bam_core.utils.etc import now_est, now_utc
 from bam_core.constants import AIRTABLE_DATETIME_FORMAT
 
@@ -127,7 +127,8 @@ class SnapshotAirtableViews(Function):
                     f"Writing {len(records)} records to {tmp.name} and uploading to {filepath}"
                 )
                 try:
-                    tmp.write(obj_to_json(records).encode("utf-8"))
+                    dump_stream(records, tmp, "json")
+                    tmp.flush()
                     self.s3.upload(
                         tmp.name, filepath, mimetype="application/json"
                     )
@@ -2,6 +2,8 @@ from typing import Any, Dict, List
 
 from bam_core.functions.base import Function
 from bam_core.functions.params import Params, Param
+from bam_core.utils.etc import chunk
+from bam_core.utils.mailjet_cache import MailjetContactCache
 
 
 class UpdateMailjetLists(Function):
@@ -34,27 +36,36 @@ class UpdateMailjetLists(Function):
         },
     ]
 
+    # the number of contacts to add to mailjet per bulk job
+    CHUNK_SIZE = 1000
+
     params = Params(
         Param(
             name="dry_run",
             type="bool",
             default=True,
             description="If true, data will not be written to Mailjet.",
-        )
+        ),
+        Param(
+            name="full_sync",
+            type="bool",
+            default=False,
+            description="If true, re-fetch every Mailjet contact instead of only those created since the last run.",
+        ),
     )
 
     def _filter_new_contacts(
         self,
         view: Dict[str, Any],
         all_contacts: List[Dict[str, Any]],
-        current_contacts: List[str],
+        current_contacts: MailjetContactCache,
     ):
         """
         Filter contacts to only include new contacts
         Args:
             view: the view configuration
             all_contacts: the list of all contacts
-            current_contacts: the list of current contacts
+            current_contacts: the emails of current contacts
         Returns:
             a list of new contacts
         """
@@ -85,7 +96,11 @@ class UpdateMailjetLists(Function):
 
     def run(self, params, context):
         results = []
-        current_contacts = set(self.mailjet.get_all_emails())
+        current_contacts = MailjetContactCache(self.mailjet, self.s3)
+        current_contacts.sync(full=params["full_sync"])
+        # contacts are only recorded once every view has been diffed,
+        # so a contact who is new to several views is added to each one's lists
+        added_emails = set()
         for view in self.CONFIG:
             self.log.info(f"Syncing contacts from {view['table_name']}")
             fields = view.get("fields")
@@ -102,24 +117,32 @@ class UpdateMailjetLists(Function):
                 f"Syncing {n_new_contacts} new contacts from {view['table_name']} to mailjet lists: {view['lists']}"
             )
 
-            # sync to all lists
+            # sync to all lists, in bulk
             n_failures = 0
-            for contact in new_contacts:
-                for list_name in view["lists"]:
-                    kwargs = {**contact, "list_name": list_name}
-                    self.log.info(
-                        f"Adding contact {contact} to list {list_name}"
+            for contacts in chunk(new_contacts, self.CHUNK_SIZE):
+                self.log.info(
+                    f"Adding {len(contacts)} contacts to lists {view['lists']}"
+                )
+                if params["dry_run"]:
+                    self.log.info("Dry run enabled. Skipping...")
+                    continue
+                try:
+                    job = self.mailjet.add_many_contacts_to_lists(
+                        contacts, view["lists"]
                     )
-                    if params["dry_run"]:
-                        self.log.info("Dry run enabled. Skipping...")
-                        continue
-                    try:
-                        self.mailjet.add_contact_to_list(**kwargs)
-                    except Exception as e:
-                        n_failures += 1
-                        self.log.error(
-                            f"Failed to add contact {contact} to list {list_name}: {e}. Continuing..."
-                        )
+                except Exception as e:
+                    n_failures += len(contacts)
+                    self.log.error(
+                        f"Failed to add {len(contacts)} contacts to lists {view['lists']}: {e}. Continuing..."
+                    )
+                    continue
+                if job.get("Error"):
+                    self.log.error(
+                        f"Some contacts could not be added to lists {view['lists']}: {job['Error']} {job.get('ErrorFile', '')}"
+                    )
+                    # the next sync will pick up whichever contacts were added
+                    continue
+                added_emails.update(contact["email"] for contact in contacts)
 
             results.append(
                 {
@@ -128,6 +151,12 @@ class UpdateMailjetLists(Function):
                     "n_failures": n_failures,
                 }
             )
+        current_contacts.add(added_emails)
+        current_contacts.save()
+        for endpoint, stats in self.mailjet.get_latency_stats().items():
+            self.log.info(
+                f"Mailjet {endpoint}: {stats['count']} requests, {stats['mean']:.3f}s mean, {stats['max']:.3f}s max"
+            )
         return results
 
 
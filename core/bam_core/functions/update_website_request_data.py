@@ -147,8 +147,8 @@ class UpdateWebsiteRequestData(Function):
         self.log.info(
             f"Uploaded file with updated ts: {now.isoformat()} to digital ocean space: {fp}"
         )
-        self.s3.purge_cdn_cache(prefix)
-        self.log.info(f"Purged CDN cache for file: {prefix}")
+        self.s3.queue_cdn_purge(prefix)
+        self.log.info(f"Queued CDN cache purge for file: {prefix}")
         return output_data
 
 
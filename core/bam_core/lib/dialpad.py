@@ -1,11 +1,17 @@
 import csv
-from typing import Any, Generator
+from typing import Any, Generator, List, Optional
 import requests
-import time
 import random
 
 from bam_core.lib.airtable_v2 import Household
-from bam_core.settings import DIALPAD_API_TOKEN, DIALPAD_USER_ID
+from bam_core.settings import (
+    DIALPAD_API_TOKEN,
+    DIALPAD_USER_ID,
+    DIALPAD_SMS_RATE_LIMIT,
+    DIALPAD_SMS_RATE_WINDOW,
+    DIALPAD_MAX_RETRIES,
+)
+from bam_core.utils.rate_limit import RateLimiter
 
 DIALPAD_API_URL = "https://dialpad.com/api/v2/sms"
 BAM_URL = "https://bushwickayudamutua.com/"
@@ -23,9 +29,15 @@ class Dialpad:
         first_name_field="First Name",
         phone_number_field="Phone Number",
         logger=None,
+        rate_limit=DIALPAD_SMS_RATE_LIMIT,
+        rate_window=DIALPAD_SMS_RATE_WINDOW,
+        max_retries=DIALPAD_MAX_RETRIES,
     ):
         self.api_token = api_token
         self.user_id = user_id
+        # paces sends by message segment, and slows down when rate limited
+        self.rate_limiter = RateLimiter(rate_limit, rate_window)
+        self.max_retries = max_retries
         self.first_name_field = first_name_field  # Default field for first names, can be overridden
         self.phone_number_field = phone_number_field  # Default field for phone numbers, can be overridden
         self.log = logger
@@ -73,17 +85,84 @@ class Dialpad:
             split_messages.append(current_message.strip())
         return split_messages
 
-    def send_sms(
-        self, rows: list[dict[str, Any]], message: str, testing: bool = False
-    ) -> Generator[dict[str, Any], None, None]:
-        for i, row in enumerate(rows):
-            if not testing and i % 30 == 0 and i != 0:
+    def _get_retry_after(self, response) -> Optional[float]:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def _post_sms(self, phone_num: str, text: str) -> requests.Response:
+        """
+        Send one message segment once the rate limiter allows it,
+        retrying requests which are rate limited
+        """
+        payload = {
+            "infer_country_code": False,
+            "to_numbers": phone_num,
+            "text": text,
+            "user_id": self.user_id,
+        }
+        headers = {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "authorization": f"Bearer {self.api_token}",
+        }
+        attempt = 0
+        while True:
+            waited = self.rate_limiter.acquire()
+            if waited > 5:
                 self.log.info(
-                    "Taking a little nap so that we don't get rate limited, will start back up in 30 seconds 😴"
+                    f"Waited {waited:.0f} seconds so that we don't get rate limited 😴"
                 )
-                time.sleep(30)
-                self.log.info("Texts are sending, go to dialpad 🐥💼")
+            response = requests.post(
+                DIALPAD_API_URL, json=payload, headers=headers
+            )
+            if response.status_code != 429 or attempt >= self.max_retries:
+                if response.ok:
+                    self.rate_limiter.recover()
+                return response
+            attempt += 1
+            self.log.info(
+                f"Dialpad rate limited us, retrying (attempt {attempt} of {self.max_retries})"
+            )
+            self.rate_limiter.throttle(self._get_retry_after(response))
 
+    def _send_message(
+        self,
+        phone_num: str,
+        first_name: str,
+        split_messages: List[str],
+        testing: bool = False,
+    ) -> None:
+        """
+        Send each segment of a message to a phone number,
+        stopping at the first error
+        """
+        for current_split_message in split_messages:
+            self.log.info(
+                f"""[{phone_num}] {"WOULD SEND" if testing else "SENDING"}: '{current_split_message}'"""
+            )
+            if testing:
+                continue
+            try:
+                response = self._post_sms(phone_num, current_split_message)
+                json_resp = response.json()
+                self.log.info(f"Response: {json_resp}")
+                if not response.ok:
+                    api_error_message = json_resp.get("error", {}).get(
+                        "message", "Unknown error"
+                    )
+                    self.log.error(
+                        f"Error sending message to {first_name} at {phone_num}: {api_error_message}"
+                    )
+                    break
+            except Exception as e:
+                self.log.error(f"Error: {e}")
+
+    def send_sms(
+        self, rows: list[dict[str, Any]], message: str, testing: bool = False
+    ) -> Generator[dict[str, Any], None, None]:
+        for row in rows:
             request_url = self._get_random_request_url()
             first_name = self._get_first_word(
                 row.get(self.first_name_field, "")
@@ -97,53 +176,13 @@ class Dialpad:
             ).replace("[REQUEST_URL]", request_url)
             split_messages = self._split_message(updated_message)
 
-            for current_split_message in split_messages:
-                payload = {
-                    "infer_country_code": False,
-                    "to_numbers": phone_num,
-                    "text": current_split_message,
-                    "user_id": self.user_id,
-                }
-                headers = {
-                    "accept": "application/json",
-                    "content-type": "application/json",
-                    "authorization": f"Bearer {self.api_token}",
-                }
-                self.log.info(
-                    f"""[{phone_num}] {"WOULD SEND" if testing else "SENDING"}: '{current_split_message}'"""
-                )
-                if not testing:
-                    try:
-                        response = requests.post(
-                            DIALPAD_API_URL, json=payload, headers=headers
-                        )
-                        json_resp = response.json()
-                        self.log.info(f"Response: {json_resp}")
-                        if not response.ok:
-                            api_error_message = json_resp.get("error", {}).get(
-                                "message", "Unknown error"
-                            )
-                            self.log.error(
-                                f"Error sending message to {first_name} at {phone_num}: {api_error_message}"
-                            )
-                            break
-                    except Exception as e:
-                        self.log.error(f"Error: {e}")
-            if not testing:
-                time.sleep(2)
+            self._send_message(phone_num, first_name, split_messages, testing)
             yield row
 
     def send_sms_v2(
         self, households: list[Household], message: str, testing: bool = False
     ) -> Generator[Household, None, None]:
-        for i, household in enumerate(households):
-            if not testing and i % 30 == 0 and i != 0:
-                self.log.info(
-                    "Taking a little nap so that we don't get rate limited, will start back up in 30 seconds 😴"
-                )
-                time.sleep(30)
-                self.log.info("Texts are sending, go to dialpad 🐥💼")
-
+        for household in households:
             request_url = self._get_random_request_url()
             first_name = household.name
             phone_num = self._clean_phone_number(household.phone_number)
@@ -153,40 +192,7 @@ class Dialpad:
             ).replace("[REQUEST_URL]", request_url)
             split_messages = self._split_message(updated_message)
 
-            for current_split_message in split_messages:
-                payload = {
-                    "infer_country_code": False,
-                    "to_numbers": phone_num,
-                    "text": current_split_message,
-                    "user_id": self.user_id,
-                }
-                headers = {
-                    "accept": "application/json",
-                    "content-type": "application/json",
-                    "authorization": f"Bearer {self.api_token}",
-                }
-                self.log.info(
-                    f"""[{phone_num}] {"WOULD SEND" if testing else "SENDING"}: '{current_split_message}'"""
-                )
-                if not testing:
-                    try:
-                        response = requests.post(
-                            DIALPAD_API_URL, json=payload, headers=headers
-                        )
-                        json_resp = response.json()
-                        self.log.info(f"Response: {json_resp}")
-                        if not response.ok:
-                            api_error_message = json_resp.get("error", {}).get(
-                                "message", "Unknown error"
-                            )
-                            self.log.error(
-                                f"Error sending message to {first_name} at {phone_num}: {api_error_message}"
-                            )
-                            break
-                    except Exception as e:
-                        self.log.error(f"Error: {e}")
-            if not testing:
-                time.sleep(2)
+            self._send_message(phone_num, first_name, split_messages, testing)
             yield household
 
     def send_sms_from_csv(self, file_path, user_message):
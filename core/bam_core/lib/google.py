@@ -1,13 +1,17 @@
 import json
 from functools import cached_property
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import httpx
 import gspread
 import googlemaps
+from googlemaps import convert
 
 from bam_core.lib import olc
 from bam_core.settings import (
     GOOGLE_MAPS_API_KEY,
+    GOOGLE_MAPS_BASE_URL,
+    GOOGLE_ADDRESS_VALIDATION_URL,
     GOOGLE_SERVICE_ACCOUNT_CONFIG,
 )
 from bam_core.constants import MAYDAY_LOCATION, MAYDAY_RADIUS
@@ -20,7 +24,9 @@ class GoogleMaps(object):
 
     @cached_property
     def client(self):
-        return googlemaps.Client(key=self.api_key)
+        return googlemaps.Client(
+            key=self.api_key, base_url=GOOGLE_MAPS_BASE_URL
+        )
 
     def get_lat_lng(
         self, address: str
@@ -85,6 +91,140 @@ class GoogleMaps(object):
         return self.client.addressvalidation(address)
 
 
+class AsyncGoogleMaps(object):
+    """
+    An asyncio version of ``GoogleMaps`` which calls the Google Maps web
+    services directly through a pooled ``httpx.AsyncClient``.
+    """
+
+    base_url = GOOGLE_MAPS_BASE_URL
+    address_validation_url = GOOGLE_ADDRESS_VALIDATION_URL
+
+    def __init__(
+        self,
+        api_key=GOOGLE_MAPS_API_KEY,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 10.0,
+        event_hooks: Optional[Dict[str, List[Callable]]] = None,
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.event_hooks = event_hooks
+        if client is not None:
+            self.client = client
+
+    @cached_property
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            event_hooks=self.event_hooks,
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=20
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled connections
+        """
+        if "client" in self.__dict__:
+            await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a GET request to a Google Maps web service,
+        raising on the same statuses as the ``googlemaps`` client
+        """
+        response = await self.client.get(
+            self.base_url + path, params={**params, "key": self.api_key}
+        )
+        response.raise_for_status()
+        body = response.json()
+        status = body.get("status")
+        if status not in ("OK", "ZERO_RESULTS"):
+            raise googlemaps.exceptions.ApiError(
+                status, body.get("error_message")
+            )
+        return body
+
+    async def get_lat_lng(
+        self, address: str
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Get the latitude and longitude of an address
+        Args:
+            address (str): The address to get the lat/lng for
+        """
+        body = await self._get("/maps/api/geocode/json", {"address": address})
+        geocode_results = body.get("results", [])
+        if not geocode_results:
+            return None, None
+        loc = geocode_results[0]["geometry"]["location"]
+        return loc["lat"], loc["lng"]
+
+    def get_plus_code(
+        self, lat: Optional[float], lng: Optional[float]
+    ) -> Optional[str]:
+        """
+        Get a de-specified plus code for a given address
+        Args:
+            address (str): The address to compute a code for
+        """
+        if not lat or not lng:
+            return None
+        return olc.encode(lat, lng)
+
+    async def get_place(
+        self,
+        address: str,
+        location: str = MAYDAY_LOCATION,
+        radius: float = MAYDAY_RADIUS,
+        types: list[str] = ["premise", "subpremise", "geocode"],
+        language: str = "en-US",
+        strict_bounds: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a place from the Google Maps API
+        Args:
+            address (str): The address to search for
+            location (tuple): The location to search around
+            radius (int): The radius to search within
+            types (list): The types of places to search for
+            language (str): The language to search in
+            strict_bounds (bool): Whether to use strict bounds
+        """
+        params = {
+            "input": address,
+            "location": convert.latlng(location),
+            "radius": radius,
+            "types": types,
+            "language": language,
+        }
+        if strict_bounds:
+            params["strictbounds"] = "true"
+        body = await self._get("/maps/api/place/autocomplete/json", params)
+        return body.get("predictions", [])
+
+    async def get_normalized_address(self, address: str) -> Dict[str, Any]:
+        """
+        Normalize an address using the Google Maps API
+        Args:
+            address (str): The address to normalize
+        """
+        response = await self.client.post(
+            self.address_validation_url,
+            params={"key": self.api_key},
+            json={"address": {"addressLines": address}},
+        )
+        return response.json()
+
+
 class GoogleSheets(object):
     def __init__(self):
         pass
@@ -1,8 +1,28 @@
+import re
+import itertools
+import math
 import time
-from typing import Any, Dict, List
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from bam_core import settings
+from bam_core.utils.etc import now_utc
+
+log = logging.getLogger(__name__)
+
+# responses which are worth retrying
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+# collapse IDs in endpoints so latency is counted per endpoint, not per ID
+ENDPOINT_ID_RE = re.compile(r"/\d+(?=/|$)")
 
 
 class Mailjet(object):
@@ -20,32 +40,151 @@ class Mailjet(object):
     ACTION_REMOVE = "remove"
     ACTION_UNSUBSCRIBE = "unsub"
 
+    # statuses of bulk jobs
+    JOB_COMPLETED = "Completed"
+    JOB_ERROR = "Error"
+
     def __init__(
         self,
         api_key=settings.MAILJET_API_KEY,
         api_secret=settings.MAILJET_API_SECRET,
+        base_url: str = settings.MAILJET_BASE_URL,
+        max_retries: int = settings.MAILJET_MAX_RETRIES,
+        backoff: float = 1,
+        max_backoff: float = 60,
+        timeout: float = settings.MAILJET_TIMEOUT,
+        pool_size: int = 10,
     ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        # reuse connections across requests
+        self.session = requests.Session()
         self.auth = (api_key, api_secret)
-        self.base_url = "https://api.mailjet.com/v3/REST/"
+        self.session.auth = self.auth
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._latency = {}
+        self._latency_lock = threading.Lock()
+
+    def _record_latency(self, endpoint: str, seconds: float) -> None:
+        """
+        Record the latency of a request to an endpoint
+        """
+        endpoint = ENDPOINT_ID_RE.sub("/{id}", endpoint)
+        with self._latency_lock:
+            stats = self._latency.setdefault(
+                endpoint, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the number of requests made to each endpoint and their
+        total, mean and max latency in seconds
+        """
+        with self._latency_lock:
+            return {
+                endpoint: dict(stats, mean=stats["total"] / stats["count"])
+                for endpoint, stats in self._latency.items()
+            }
+
+    def _get_rate_limit_delay(self, response) -> Optional[float]:
+        """
+        Get the number of seconds a rate limited response asks us to wait,
+        from its Retry-After or X-RateLimit-Reset header
+        """
+        value = response.headers.get("Retry-After")
+        if value is None:
+            value = response.headers.get("X-RateLimit-Reset")
+        if value is None:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            # Retry-After may also be an HTTP date
+            try:
+                delay = (
+                    parsedate_to_datetime(value) - now_utc()
+                ).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        # large values are unix timestamps, not a number of seconds
+        if delay > 1e9:
+            delay -= time.time()
+        return min(max(delay, 0), self.max_backoff)
+
+    def _get_retry_delay(self, attempt: int, response=None) -> float:
+        """
+        Get the number of seconds to wait before retrying, using
+        exponential backoff with full jitter, or a rate limit header
+        """
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff * 2**attempt)
+        )
+        if response is not None:
+            rate_limit_delay = self._get_rate_limit_delay(response)
+            if rate_limit_delay is not None:
+                delay = max(delay, rate_limit_delay)
+        return delay
 
     def _make_request(self, method, endpoint, data=None, params={}):
         """
-        Make a request to the Mailjet API
+        Make a request to the Mailjet API, retrying connection errors,
+        rate limited and failed requests
         """
         url = self.base_url + endpoint
-        nb_tries = 10
+        attempt = 0
         while True:
-            nb_tries -= 1
+            start = time.perf_counter()
             try:
-                # Request url
-                return requests.request(
-                    method, url, auth=self.auth, json=data, params=params
+                response = self.session.request(
+                    method, url, json=data, params=params, timeout=self.timeout
                 )
-            except Exception as err:
-                if nb_tries == 0:
+            except requests.exceptions.RequestException as err:
+                self._record_latency(endpoint, time.perf_counter() - start)
+                if attempt >= self.max_retries:
                     raise err
-                else:
-                    time.sleep(1 + 10 / nb_tries)
+                reason = str(err)
+                delay = self._get_retry_delay(attempt)
+            else:
+                self._record_latency(endpoint, time.perf_counter() - start)
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                reason = f"status {response.status_code}"
+                delay = self._get_retry_delay(attempt, response)
+            attempt += 1
+            log.warning(
+                f"{method} {endpoint} failed ({reason})."
+                f" Attempt {attempt} of {self.max_retries}."
+                f" Waiting {delay:.2f} seconds before retrying."
+            )
+            time.sleep(delay)
+
+    def _get_error_message(self, result) -> str:
+        """
+        Get the error message from a failed request
+        """
+        try:
+            data = result.json()
+            return f"{data.get('ErrorMessage')}: {data.get('ErrorInfo')}"
+        except:
+            return result.content or "Unknown error"
+
+    def _raise_for_error(self, result) -> None:
+        """
+        Raise an exception if a request failed
+        """
+        if not str(result.status_code).startswith("2"):
+            raise Exception(self._get_error_message(result))
 
     def add_contact(self, email: str, name=None):
         """
@@ -58,13 +197,7 @@ class Mailjet(object):
 
         # handle errors and check if the contact already exists
         if not str(result.status_code).startswith("2"):
-            try:
-                data = result.json()
-                error_message = (
-                    f"{data.get('ErrorMessage')}: {data.get('ErrorInfo')}"
-                )
-            except:
-                error_message = result.content or "Unknown error"
+            error_message = self._get_error_message(result)
             if "already exists" in error_message and email in error_message:
                 return None
             raise Exception(error_message)
@@ -94,15 +227,7 @@ class Mailjet(object):
         endpoint = f"contactslist/{list_id}/managecontact"
         result = self._make_request("POST", endpoint, data=data)
 
-        if not str(result.status_code).startswith("2"):
-            try:
-                data = result.json()
-                error_message = (
-                    f"{data.get('ErrorMessage')}: {data.get('ErrorInfo')}"
-                )
-            except:
-                error_message = result.content or "Unknown error"
-            raise Exception(error_message)
+        self._raise_for_error(result)
         return result.json().get("Data", [])[0]
 
     def add_contact_to_list(
@@ -144,52 +269,196 @@ class Mailjet(object):
             email, list_name, self.ACTION_UNSUBSCRIBE, **properties
         )
 
+    def manage_many_contacts(
+        self,
+        contacts: List[Dict[str, Any]],
+        list_names: List[str],
+        action: str = ACTION_ADD,
+    ) -> int:
+        """
+        Start a job to add, remove or unsubscribe many contacts
+        from many lists in a single request
+        Args:
+            contacts: a list of contacts with an 'email' and
+                optionally other properties (eg: 'firstname')
+            list_names: the names of the lists to manage
+            action: either 'addnoforce' or 'remove' or 'unsub'
+        Returns:
+            the ID of the job
+        """
+        contacts_lists = []
+        for list_name in list_names:
+            list_id = self.CONTACT_LISTS.get(list_name)
+            if not list_id:
+                raise Exception(f"Invalid list name: {list_name}")
+            contacts_lists.append({"ListID": list_id, "Action": action})
+        data = {
+            "Contacts": [
+                {
+                    "Email": contact["email"],
+                    "Properties": {
+                        k: v for k, v in contact.items() if k != "email"
+                    },
+                }
+                for contact in contacts
+            ],
+            "ContactsLists": contacts_lists,
+        }
+        result = self._make_request(
+            "POST", "contact/managemanycontacts", data=data
+        )
+        self._raise_for_error(result)
+        return result.json().get("Data", [])[0]["JobID"]
+
+    def get_job_status(self, job_id: int) -> Dict[str, Any]:
+        """
+        Get the status of a job started by manage_many_contacts
+        Args:
+            job_id: the ID of the job
+        Returns:
+            the job, including its 'Status' and any 'Error'
+        """
+        result = self._make_request(
+            "GET", f"contact/managemanycontacts/{job_id}"
+        )
+        self._raise_for_error(result)
+        return result.json().get("Data", [])[0]
+
+    def wait_for_job(
+        self, job_id: int, poll_interval: float = 2, timeout: float = 600
+    ) -> Dict[str, Any]:
+        """
+        Poll a job until it completes
+        Args:
+            job_id: the ID of the job
+            poll_interval: the number of seconds between polls
+            timeout: the maximum number of seconds to wait
+        Returns:
+            the completed job
+        """
+        deadline = time.time() + timeout
+        while True:
+            job = self.get_job_status(job_id)
+            status = job.get("Status")
+            if status == self.JOB_COMPLETED:
+                return job
+            if status == self.JOB_ERROR:
+                raise Exception(f"Job {job_id} failed: {job.get('Error')}")
+            if time.time() >= deadline:
+                raise Exception(
+                    f"Job {job_id} did not complete within {timeout}s"
+                )
+            time.sleep(poll_interval)
+
+    def add_many_contacts_to_lists(
+        self, contacts: List[Dict[str, Any]], list_names: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Add many contacts to many lists in a single job,
+        and wait for it to complete
+        Args:
+            contacts: a list of contacts with an 'email' and
+                optionally other properties (eg: 'firstname')
+            list_names: the names of the lists to add the contacts to
+        Returns:
+            the completed job
+        """
+        job_id = self.manage_many_contacts(contacts, list_names)
+        return self.wait_for_job(job_id)
+
     def get_contacts(
-        self, limit: int = 1000, offset: int = 0
+        self, limit: int = 1000, offset: int = 0, sort: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get a list of contacts
         Args:
             limit: the number of contacts to return
             offset: the number of contacts to skip
+            sort: the field to sort contacts by (eg: 'ID DESC')
         Returns:
             a list of contacts
         """
-        result = self._make_request(
-            "GET", "contact", params={"Limit": limit, "Offset": offset}
-        )
-        if not str(result.status_code).startswith("2"):
-            try:
-                data = result.json()
-                error_message = (
-                    f"{data.get('ErrorMessage')}: {data.get('ErrorInfo')}"
-                )
-            except:
-                error_message = result.content or "Unknown error"
-            raise Exception(error_message)
+        params = {"Limit": limit, "Offset": offset}
+        if sort:
+            params["Sort"] = sort
+        result = self._make_request("GET", "contact", params=params)
+        self._raise_for_error(result)
         return result.json().get("Data", [])
 
-    def get_all_contacts(self) -> List[Dict[str, Any]]:
+    def get_contact_count(self) -> int:
         """
-        Get all contacts
+        Get the total number of contacts
+        """
+        result = self._make_request("GET", "contact", params={"countOnly": 1})
+        self._raise_for_error(result)
+        return result.json().get("Count", 0)
+
+    def get_all_contacts(
+        self,
+        limit: int = 1000,
+        concurrency: int = settings.MAILJET_CONCURRENCY,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Get all contacts, fetching pages concurrently
+        Args:
+            limit: the number of contacts to fetch per request
+            concurrency: the maximum number of pages to fetch at once
+        Returns:
+            a generator of contacts, in page order
+        """
+        n_pages = math.ceil(self.get_contact_count() / limit)
+        offsets = iter(range(0, n_pages * limit, limit))
+        page = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # keep at most `concurrency` pages in flight, and in order
+            pending = deque(
+                executor.submit(self.get_contacts, limit, offset)
+                for offset in itertools.islice(offsets, concurrency)
+            )
+            while pending:
+                page = pending.popleft().result()
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(
+                        executor.submit(self.get_contacts, limit, offset)
+                    )
+                yield from page
+        # pick up any contacts created after they were counted
+        offset = n_pages * limit
+        while len(page) == limit:
+            page = self.get_contacts(limit=limit, offset=offset)
+            yield from page
+            offset += limit
+
+    def iter_contacts_since(
+        self, contact_id: int, limit: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Get the contacts created after a contact, newest first.
+        Contact IDs only increase, so this pages through contacts
+        sorted by ID and stops at the first one which isn't newer.
+        Args:
+            contact_id: the ID of the last contact already seen
+            limit: the number of contacts to fetch per request
+        Returns:
+            a generator of contacts
         """
-        contacts = []
-        limit = 1000
         offset = 0
         while True:
-            result = self.get_contacts(limit=limit, offset=offset)
-            if not result:
-                break
-            contacts.extend(result)
+            contacts = self.get_contacts(
+                limit=limit, offset=offset, sort="ID DESC"
+            )
+            for contact in contacts:
+                if contact["ID"] <= contact_id:
+                    return
+                yield contact
+            if len(contacts) < limit:
+                return
             offset += limit
-        return contacts
 
-    def get_all_emails(self) -> List[str]:
+    def get_all_emails(self) -> Iterator[str]:
         """
         Get all emails
         """
-        emails = []
-        contacts = self.get_all_contacts()
-        for contact in contacts:
-            emails.append(contact.get("Email").lower())
-        return emails
+        for contact in self.get_all_contacts():
+            yield contact.get("Email").lower()
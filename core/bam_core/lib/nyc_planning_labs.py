@@ -1,9 +1,14 @@
-from typing import Any, Dict
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
 import requests
 
+from bam_core.settings import NYC_PLANNING_LABS_BASE_URL
+
 
 class NycPlanningLabs(object):
-    base_url = "https://geosearch.planninglabs.nyc/v2"
+    base_url = NYC_PLANNING_LABS_BASE_URL
 
     def __init__(self):
         self.session = requests.Session()
@@ -31,3 +36,68 @@ class NycPlanningLabs(object):
             requests.exceptions.ConnectionError,
         ) as e:
             return {"error": str(e)}
+
+
+class AsyncNycPlanningLabs(object):
+    """
+    An asyncio version of ``NycPlanningLabs`` which shares a pooled
+    ``httpx.AsyncClient`` across requests.
+    """
+
+    base_url = NycPlanningLabs.base_url
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 10.0,
+        event_hooks: Optional[Dict[str, List[Callable]]] = None,
+    ):
+        self.timeout = timeout
+        self.event_hooks = event_hooks
+        if client is not None:
+            self.client = client
+
+    @cached_property
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            event_hooks=self.event_hooks,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=20
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled connections
+        """
+        if "client" in self.__dict__:
+            await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def search(self, text: str, size: int = 1) -> Dict[str, Any]:
+        """
+        Search for a location in NYC using the geosearch API
+        Args:
+            text (str): The text to search for
+            size (int): The number of results to return
+        Returns:
+            Dict[str, Any]: The response from the geosearch API
+        """
+        url = f"{self.base_url}/search"
+        params = {"text": text, "size": size}
+        try:
+            response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            return {"error": str(e)}
@@ -7,9 +7,20 @@
 #
 #   Encode a location:
 #   encode(47.365590, 8.524997)
+#
+#   Encode many locations at once (requires numpy):
+#   encode_many([47.365590, 40.7128], [8.524997, -74.0060])
+#
+#   Decode a code into its bounding box:
+#   decode("8FVC9G8F+")
 
 import math
-from typing import Optional
+from typing import List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # A separator used to break the code into two parts to aid memorability.
 SEPARATOR_ = "+"
@@ -68,6 +79,25 @@ BWK_CODE_LENGTH_ = 8
 LATITUDE_PRECISION_ = pow(20, math.floor((BWK_CODE_LENGTH_ / -2) + 2))
 
 
+class CodeArea(NamedTuple):
+    """
+    The bounding box of a plus code, in degrees
+    """
+
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @property
+    def latitude_center(self) -> float:
+        return (self.south + self.north) / 2
+
+    @property
+    def longitude_center(self) -> float:
+        return (self.west + self.east) / 2
+
+
 def encode(
     latitude: Optional[float], longitude: Optional[float]
 ) -> Optional[str]:
@@ -137,3 +167,88 @@ def normalize_longitude(longitude):
     while longitude >= 180:
         longitude = longitude - 360
     return longitude
+
+
+def encode_many(
+    latitudes: Sequence[Optional[float]], longitudes: Sequence[Optional[float]]
+) -> List[Optional[str]]:
+    """
+    Encode arrays of locations into Open Location Codes, giving the same
+    codes as ``encode`` for each location. Requires numpy.
+    Args:
+    latitudes: Latitudes in signed decimal degrees.
+    longitudes: Longitudes in signed decimal degrees.
+    Returns:
+        A list of codes, with None for missing (None, NaN or 0) locations.
+    """
+    if np is None:
+        raise ImportError("encode_many requires numpy")
+    lats = np.array(latitudes, dtype=float)
+    lngs = np.array(longitudes, dtype=float)
+    if lats.shape != lngs.shape:
+        raise ValueError("latitudes and longitudes must be the same length")
+    missing = np.isnan(lats) | np.isnan(lngs) | (lats == 0) | (lngs == 0)
+    lats = np.where(missing, 0, lats)
+    lngs = np.where(missing, 0, lngs)
+
+    # Ensure that latitude and longitude are valid.
+    lats = np.clip(lats, -90, 90)
+    while (too_low := lngs < -180).any():
+        lngs[too_low] += 360
+    while (too_high := lngs >= 180).any():
+        lngs[too_high] -= 360
+    lats[lats == 90] -= LATITUDE_PRECISION_
+
+    # Convert to integers at the final precision, as in ``encode``.
+    lat_vals = np.floor(
+        np.round((lats + LATITUDE_MAX_) * FINAL_LAT_PRECISION_, 6)
+    ).astype(np.int64)
+    lng_vals = np.floor(
+        np.round((lngs + LONGITUDE_MAX_) * FINAL_LNG_PRECISION_, 6)
+    ).astype(np.int64)
+    lat_vals //= pow(GRID_ROWS_, GRID_CODE_LENGTH_)
+    lng_vals //= pow(GRID_COLUMNS_, GRID_CODE_LENGTH_)
+
+    # Only the four most significant pairs are kept in an 8 character code.
+    alphabet = np.array(list(CODE_ALPHABET_))
+    chars = np.empty((len(lats), BWK_CODE_LENGTH_ + 1), dtype="<U1")
+    chars[:, BWK_CODE_LENGTH_] = SEPARATOR_
+    pair_count = PAIR_CODE_LENGTH_ // 2
+    for i in range(BWK_CODE_LENGTH_ // 2):
+        place = ENCODING_BASE_ ** (pair_count - 1 - i)
+        chars[:, 2 * i] = alphabet[(lat_vals // place) % ENCODING_BASE_]
+        chars[:, 2 * i + 1] = alphabet[(lng_vals // place) % ENCODING_BASE_]
+    codes = chars.view(f"<U{BWK_CODE_LENGTH_ + 1}").ravel().tolist()
+    return [None if m else code for m, code in zip(missing, codes)]
+
+
+def decode(code: str) -> CodeArea:
+    """
+    Decode an Open Location Code into the area it covers.
+    Args:
+    code: An 8 character code, with or without the separator.
+    """
+    digits = code.replace(SEPARATOR_, "").upper()
+    if len(digits) != BWK_CODE_LENGTH_ or any(
+        c not in CODE_ALPHABET_ for c in digits
+    ):
+        raise ValueError(f"Invalid code: {code}")
+    # Count in units of the code's resolution so that the area is computed
+    # with a single division, avoiding floating point accumulation errors.
+    lat_units, lng_units = 0, 0
+    for i in range(BWK_CODE_LENGTH_ // 2):
+        lat_units = lat_units * ENCODING_BASE_ + CODE_ALPHABET_.index(
+            digits[2 * i]
+        )
+        lng_units = lng_units * ENCODING_BASE_ + CODE_ALPHABET_.index(
+            digits[2 * i + 1]
+        )
+    units_per_degree = round(1 / LATITUDE_PRECISION_)
+    lat_units -= LATITUDE_MAX_ * units_per_degree
+    lng_units -= LONGITUDE_MAX_ * units_per_degree
+    return CodeArea(
+        lat_units / units_per_degree,
+        lng_units / units_per_degree,
+        (lat_units + 1) / units_per_degree,
+        (lng_units + 1) / units_per_degree,
+    )
@@ -14,6 +14,7 @@ import requests
 
 from bam_core import settings
 from bam_core.utils import etc
+from bam_core.utils.retry import retry
 
 log = logging.getLogger(__name__)
 
@@ -75,6 +76,9 @@ class S3(object):
         if self.platform == "s3":
             self.scheme = "s3"
         self.s3_prefix = f"{self.scheme}://{self.bucket_name}/"
+        # prefixes to purge from the CDN cache at the end of a run
+        # (a dict is used as an insertion-ordered set)
+        self.cdn_purge_queue = {}
 
     # ////////////////////////
     #  Absolute Key Formatting
@@ -171,6 +175,17 @@ class S3(object):
             if f:
                 f.close()
 
+    def get_stream(self, key: str):
+        """
+        Get a streaming body for a key's contents, which can be read
+        incrementally (eg: via ``serde.load_stream``). The caller is
+        responsible for closing it.
+        :param key: An S3 key
+        :return botocore.response.StreamingBody
+        """
+        obj = self.resource.Object(self.bucket_name, self._in_key(key))
+        return obj.get()["Body"]
+
     def exists(self, key: str) -> bool:
         f"""
         Check whether this key exists
@@ -429,17 +444,55 @@ class S3(object):
             self.client.meta.endpoint_url, self.bucket_name, self._in_key(key)
         )
 
-    def purge_cdn_cache(self, prefix=""):
+    # ////////////////////////
+    #  CDN Cache
+    # ///////////////////////
+
+    def queue_cdn_purge(self, prefix: str = "") -> None:
         """
-        curl -X DELETE -H "Content-Type: application/json" \
-        -H "Authorization: Bearer $API_TOKEN" \
-        -d '{"files": ["*"]}' \
-        "https://api.digitalocean.com/v2/cdn/endpoints/<CDN_ENDPOINT_ID>/cache"
+        Queue a prefix to be purged from the CDN cache when the queue is flushed.
+        Prefixes are deduplicated, so queueing the same file twice only purges it once.
+        :param prefix: A prefix (or filepath) to purge
+        :return None
+        """
+        self.cdn_purge_queue.setdefault(f"{prefix}*", None)
+
+    def flush_cdn_purge_queue(self) -> bool:
+        """
+        Purge all queued prefixes from the CDN cache with a single request.
+        If nothing was queued, no request is made.
+        :return bool
+        """
+        if not self.cdn_purge_queue:
+            return False
+        files = list(self.cdn_purge_queue.keys())
+        try:
+            self._purge_cdn_files(files)
+        finally:
+            self.cdn_purge_queue.clear()
+        log.info(f"Purged {len(files)} file(s) from the CDN cache: {files}")
+        return True
+
+    @retry(attempts=5, wait=1, backoff=2)
+    def _purge_cdn_files(self, files: List[str]) -> None:
+        """
+        Purge a list of files / wildcards from the CDN cache.
+        :param files: A list of files to purge
+        :return None
         """
         r = requests.delete(
             f"https://api.digitalocean.com/v2/cdn/endpoints/{settings.S3_CDN_ID}/cache",
             headers={"Authorization": "Bearer {}".format(settings.DO_TOKEN)},
-            json={"files": [f"{prefix}*"]},
+            json={"files": files},
         )
         r.raise_for_status()
+
+    def purge_cdn_cache(self, prefix=""):
+        """
+        curl -X DELETE -H "Content-Type: application/json" \
+        -H "Authorization: Bearer $API_TOKEN" \
+        -d '{"files": ["*"]}' \
+        "https://api.digitalocean.com/v2/cdn/endpoints/<CDN_ENDPOINT_ID>/cache"
+        """
+        self._purge_cdn_files([f"{prefix}*"])
         return True
@@ -4,6 +4,7 @@ import logging
 import logging.config
 import json
 import base64
+import tempfile
 
 # load .env file
 dotenv.load_dotenv()
@@ -30,15 +31,60 @@ AIRTABLE_V2_ASSISTANCE_REQUESTS_TABLE_ID = os.getenv(
 # mailjet settings
 MAILJET_API_KEY = os.getenv("BAM_MAILJET_API_KEY", None)
 MAILJET_API_SECRET = os.getenv("BAM_MAILJET_API_SECRET", None)
+MAILJET_BASE_URL = os.getenv(
+    "BAM_MAILJET_BASE_URL", "https://api.mailjet.com/v3/REST/"
+)
+# retries of rate limited (429) and failed (5xx) requests
+MAILJET_MAX_RETRIES = int(os.getenv("BAM_MAILJET_MAX_RETRIES", 5))
+MAILJET_TIMEOUT = float(os.getenv("BAM_MAILJET_TIMEOUT", 30))
+# the number of pages of contacts to fetch at once
+MAILJET_CONCURRENCY = int(os.getenv("BAM_MAILJET_CONCURRENCY", 4))
+# where the set of known mailjet contacts is stored on s3
+MAILJET_CONTACT_CACHE_KEY = os.getenv(
+    "BAM_MAILJET_CONTACT_CACHE_KEY", "mailjet/contact-cache.json.gz"
+)
+# how often to re-fetch every contact, to pick up deleted contacts
+MAILJET_CONTACT_CACHE_FULL_SYNC_INTERVAL = int(
+    os.getenv("BAM_MAILJET_CONTACT_CACHE_FULL_SYNC_INTERVAL", 60 * 60 * 24 * 7)
+)
 
 # google settings
 GOOGLE_MAPS_API_KEY = os.getenv("BAM_GOOGLE_MAPS_API_KEY", None)
+# overridable to point at local stand-ins, eg: for benchmarks
+GOOGLE_MAPS_BASE_URL = os.getenv(
+    "BAM_GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com"
+)
+GOOGLE_ADDRESS_VALIDATION_URL = os.getenv(
+    "BAM_GOOGLE_ADDRESS_VALIDATION_URL",
+    "https://addressvalidation.googleapis.com/v1:validateAddress",
+)
 GOOGLE_SERVICE_ACCOUNT_CONFIG = json.loads(
     base64.b64decode(
         os.getenv("BAM_GOOGLE_SERVICE_ACCOUNT_JSON_BASE64", "e30=")
     )
 )
 
+# nyc planning labs settings
+NYC_PLANNING_LABS_BASE_URL = os.getenv(
+    "BAM_NYC_PLANNING_LABS_BASE_URL", "https://geosearch.planninglabs.nyc/v2"
+)
+
+# local cache settings, shared by every process on a host
+CACHE_PATH = os.getenv(
+    "BAM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "bam_cache.sqlite")
+)
+# set to 0 to disable the geocoding cache
+GEO_CACHE_TTL = int(os.getenv("BAM_GEO_CACHE_TTL", 60 * 60 * 24 * 30))
+GEO_CACHE_MAX_SIZE = int(os.getenv("BAM_GEO_CACHE_MAX_SIZE", 100000))
+# set to 0 to disable the email domain deliverability cache
+EMAIL_DOMAIN_CACHE_TTL = int(
+    os.getenv("BAM_EMAIL_DOMAIN_CACHE_TTL", 60 * 60 * 24 * 7)
+)
+# how long to remember domains which don't accept email
+EMAIL_DOMAIN_NEGATIVE_CACHE_TTL = int(
+    os.getenv("BAM_EMAIL_DOMAIN_NEGATIVE_CACHE_TTL", 60 * 60 * 24)
+)
+
 # s3 settings
 DO_TOKEN = os.getenv("BAM_DO_TOKEN", None)
 S3_BASE_URL = os.getenv(
@@ -57,6 +103,11 @@ S3_CDN_ID = os.getenv("BAM_S3_CDN_ID", None)
 # dialpad settings
 DIALPAD_API_TOKEN = os.getenv("BAM_DIALPAD_API_TOKEN", None)
 DIALPAD_USER_ID = os.getenv("BAM_DIALPAD_USER_ID", None)
+# the number of sms segments dialpad lets us send per window (in seconds)
+DIALPAD_SMS_RATE_LIMIT = int(os.getenv("BAM_DIALPAD_SMS_RATE_LIMIT", 100))
+DIALPAD_SMS_RATE_WINDOW = float(os.getenv("BAM_DIALPAD_SMS_RATE_WINDOW", 60))
+# retries of rate limited (429) sms requests
+DIALPAD_MAX_RETRIES = int(os.getenv("BAM_DIALPAD_MAX_RETRIES", 5))
 
 # SALT for hashing
 SALT = os.getenv("BAM_SALT", "bam")
@@ -0,0 +1,184 @@
+"""
+A small key/value cache stored in SQLite, so it can be shared by every
+process on a host (eg: multiple uvicorn workers), with per-namespace
+TTL expiry, LRU eviction and hit/miss statistics.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from bam_core.utils.serde import obj_to_json, json_to_obj
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (namespace, accessed_at);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SqliteCache(object):
+    """
+    A persistent cache of JSON-serializable values
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "default",
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+    ):
+        """
+        :param path: The path to the SQLite database
+        :param namespace: The namespace for keys in this cache
+        :param ttl: The number of seconds before an entry expires
+        :param max_size: The maximum number of entries to keep
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_size = max_size
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        A connection per thread and process, since sqlite3 connections
+        can't be shared across either.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _record(self, stat: str) -> None:
+        self.conn.execute(
+            f"""
+            INSERT INTO cache_stats (namespace, {stat}) VALUES (?, 1)
+            ON CONFLICT (namespace) DO UPDATE SET {stat} = {stat} + 1
+            """,
+            (self.namespace,),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a value from the cache
+        :param key: The key to lookup
+        :param default: The value to return on a miss
+        :return Any
+        """
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            self._record("misses")
+            return default
+        self.conn.execute(
+            "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key),
+        )
+        self._record("hits")
+        return json_to_obj(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Add a value to the cache, evicting expired and
+        least recently used entries
+        :param key: The key to store
+        :param value: The value to store
+        :param ttl: Override the cache's ttl for this entry
+        :return None
+        """
+        now = time.time()
+        ttl = ttl or self.ttl
+        expires_at = now + ttl if ttl else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, obj_to_json(value), expires_at, now),
+        )
+        self.evict(now)
+
+    def evict(self, now: Optional[float] = None) -> None:
+        """
+        Remove expired entries and any entries beyond ``max_size``
+        :return None
+        """
+        self.conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now or time.time()),
+        )
+        if self.max_size:
+            self.conn.execute(
+                """
+                DELETE FROM cache WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_size),
+            )
+
+    def delete(self, key: str) -> None:
+        self.conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        )
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the statistics for this namespace
+        """
+        self.conn.execute(
+            "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+        )
+        self.conn.execute(
+            "DELETE FROM cache_stats WHERE namespace = ?", (self.namespace,)
+        )
+
+    def __len__(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss statistics for this namespace, across all processes
+        :return dict
+        """
+        row = self.conn.execute(
+            "SELECT hits, misses FROM cache_stats WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        hits, misses = row or (0, 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "size": len(self),
+        }
@@ -1,7 +1,25 @@
-import re
+import sqlite3
+import logging
+from functools import lru_cache
 from string import punctuation
-from typing import Dict, Union
-from email_validator import validate_email, EmailNotValidError
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import dns.resolver
+from email_validator import (
+    validate_email,
+    EmailNotValidError,
+    EmailUndeliverableError,
+)
+from email_validator.deliverability import validate_email_deliverability
+
+from bam_core.settings import (
+    CACHE_PATH,
+    EMAIL_DOMAIN_CACHE_TTL,
+    EMAIL_DOMAIN_NEGATIVE_CACHE_TTL,
+)
+from bam_core.utils.cache import SqliteCache
+
+log = logging.getLogger(__name__)
 
 NO_EMAIL_ERROR = "No email address provided"
 
@@ -101,6 +119,122 @@ COMMON_NULLS = [
 ]
 
 
+class SuffixRules(object):
+    """
+    An ordered list of rules which each fix an email ending in a given suffix,
+    compiled into a lookup table by suffix so that all rules are applied in a
+    single pass over the distinct suffix lengths, instead of one ``endswith``
+    check per rule.
+
+    Rules are grouped: like an ``if/elif`` chain, at most one rule in a group
+    fires, and groups are applied in order, each seeing the output of the
+    previous one.
+    """
+
+    def __init__(self):
+        self.rules = []
+        self.by_suffix = {}
+
+    def add(
+        self, group: int, suffix: str, fix: Callable[[str, str], str]
+    ) -> None:
+        self.by_suffix.setdefault(suffix, []).append(len(self.rules))
+        self.rules.append((group, suffix, fix))
+        self.lengths = sorted({len(s) for s in self.by_suffix})
+
+    def apply(self, email: str) -> str:
+        last_group = -1
+        while True:
+            # find the first rule, after the last group which fired,
+            # whose suffix matches the email
+            match = None
+            for length in self.lengths:
+                if length > len(email):
+                    break
+                for i in self.by_suffix.get(email[-length:], ()):
+                    if self.rules[i][0] > last_group:
+                        if match is None or i < match:
+                            match = i
+                        break
+            if match is None:
+                return email
+            last_group, suffix, fix = self.rules[match]
+            email = fix(email, suffix)
+
+
+def _replace_suffix(replacement: str) -> Callable[[str, str], str]:
+    # replace the matched suffix
+    return lambda email, suffix: email[: -len(suffix)] + replacement
+
+
+def _replace_all(replacement: str) -> Callable[[str, str], str]:
+    # replace every occurrence of the matched suffix
+    return lambda email, suffix: email.replace(suffix, replacement)
+
+
+def _compile_tld_rules() -> SuffixRules:
+    """
+    Common typos of .com
+    """
+    rules = SuffixRules()
+    for group, (typo, fix) in enumerate(
+        [
+            (".vom", ".com"),
+            (".col", ".com"),
+            (".comp", ".com"),
+            (".como", ".com"),
+            ("@com", ".com"),
+            (".clm", ".com"),
+            (".con", ".com"),
+            (".c", ".com"),
+            ("..com", ".com"),
+            (".com.com", ".com"),
+        ]
+    ):
+        rules.add(group, typo, _replace_suffix(fix))
+    # numbers after .com
+    for digit in "0123456789":
+        rules.add(group + 1, f".com{digit}", _replace_suffix(".com"))
+    return rules
+
+
+def _compile_domain_rules() -> SuffixRules:
+    """
+    Common misspellings of domains, and common domains
+    missing a period or with "at" spelled out
+    """
+    rules = SuffixRules()
+    group = 0
+    for misspelling, replacement in COMMON_DOMAIN_MISSPELLINGS.items():
+        for suffix, fix in [
+            (misspelling, replacement),
+            (f"{misspelling}.com", replacement),
+            (f"{misspelling}com", replacement),
+            (f"{misspelling}.es", replacement.replace(".com", ".es")),
+            (f"{misspelling}.mx", replacement.replace(".com", ".mx")),
+        ]:
+            rules.add(group, suffix, _replace_all(fix))
+        group += 1
+    for domain in COMMON_DOMAINS:
+        rules.add(group, f"{domain}com", _replace_all(f"{domain}.com"))
+        group += 1
+    for domain in COMMON_DOMAINS:
+        for tld in ["com", "mx", "es"]:
+            rules.add(
+                group, f"at{domain}.{tld}", _replace_all(f"@{domain}.{tld}")
+            )
+            group += 1
+    return rules
+
+
+TLD_RULES = _compile_tld_rules()
+DOMAIN_RULES = _compile_domain_rules()
+
+# the number of distinct email addresses to memoize
+EMAIL_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=EMAIL_CACHE_SIZE)
 def clean_email(email: str) -> str:
     """
     Clean an email address
@@ -118,78 +252,12 @@ def clean_email(email: str) -> str:
     if email.startswith("mailto:"):
         email = email[7:]
 
-    # check for .vom typos
-    if email.endswith(".vom"):
-        email = email[:-4] + ".com"
-
-    # check for .col typos
-    if email.endswith(".col"):
-        email = email[:-4] + ".com"
+    # check for .com typos (eg: .vom, .con, .com1)
+    email = TLD_RULES.apply(email)
 
-    # check for .comp typos
-    if email.endswith(".comp"):
-        email = email[:-5] + ".com"
-
-    # check for .como typos
-    if email.endswith(".como"):
-        email = email[:-5] + ".com"
-
-    # check for @com typos
-    if email.endswith("@com"):
-        email = email[:-4] + ".com"
-
-    # check for .clm typos
-    if email.endswith(".clm"):
-        email = email[:-4] + ".com"
-
-    # check for .con typos
-    if email.endswith(".con"):
-        email = email[:-4] + ".com"
-
-    # check for .c typos
-    if email.endswith(".c"):
-        email = email[:-2] + ".com"
-
-    # check for ..com typos
-    if email.endswith("..com"):
-        email = email[:-5] + ".com"
-
-    # check for doubled .com typos
-    if email.endswith(".com.com"):
-        email = email[:-8] + ".com"
-
-    # check for numbers after .com via regular expression
-    if re.search(r"\.com[0-9]$", email):
-        email = email[:-5] + ".com"
-
-    # check for common misspellings
-    for misspelling, replacement in COMMON_DOMAIN_MISSPELLINGS.items():
-        if email.endswith(misspelling):
-            email = email.replace(misspelling, replacement)
-        elif email.endswith(f"{misspelling}.com"):
-            email = email.replace(f"{misspelling}.com", replacement)
-        elif email.endswith(f"{misspelling}com"):
-            email = email.replace(f"{misspelling}com", replacement)
-        elif email.endswith(f"{misspelling}.es"):
-            es_replace = replacement.replace(".com", ".es")
-            email = email.replace(f"{misspelling}.es", es_replace)
-        elif email.endswith(f"{misspelling}.mx"):
-            mx_replace = replacement.replace(".com", ".mx")
-            email = email.replace(f"{misspelling}.mx", mx_replace)
-
-    # check for missing . in domain
-    for domain in COMMON_DOMAINS:
-        if email.endswith(f"{domain}com"):
-            email = email.replace(f"{domain}com", f"{domain}.com")
-
-    # check for at spelled out in domain
-    for domain in COMMON_DOMAINS:
-        if email.endswith(f"at{domain}.com"):
-            email = email.replace(f"at{domain}.com", f"@{domain}.com")
-        if email.endswith(f"at{domain}.mx"):
-            email = email.replace(f"at{domain}.mx", f"@{domain}.mx")
-        if email.endswith(f"at{domain}.es"):
-            email = email.replace(f"at{domain}.es", f"@{domain}.es")
+    # check for common misspellings, missing . in domain
+    # and at spelled out in domain
+    email = DOMAIN_RULES.apply(email)
 
     # check for missing .com
     for domain in COMMON_DOMAINS:
@@ -230,12 +298,106 @@ def clean_email(email: str) -> str:
     return email
 
 
+class DomainDeliverabilityChecker(object):
+    """
+    Check whether email domains accept email, remembering the answers
+    (including negative ones) so that most checks skip the DNS lookup.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[SqliteCache] = None,
+        negative_ttl: Optional[float] = EMAIL_DOMAIN_NEGATIVE_CACHE_TTL,
+        dns_resolver: Optional[dns.resolver.Resolver] = None,
+        known_domains: Iterable[str] = (),
+    ):
+        """
+        :param cache: The cache of domain > error ("" if deliverable)
+        :param negative_ttl: How long to cache undeliverable domains
+        :param dns_resolver: A dnspython-compatible resolver
+            (defaults to dnspython's default resolver)
+        :param known_domains: Domains which are known to accept email
+        """
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+        self.dns_resolver = dns_resolver
+        self.known_domains = set(known_domains)
+
+    def _resolve(self, domain: str, domain_i18n: str) -> Optional[str]:
+        """
+        Look up a domain's deliverability
+        :return: "" if deliverable, an error if not,
+            or None if it couldn't be determined
+        """
+        try:
+            info = validate_email_deliverability(
+                domain, domain_i18n, dns_resolver=self.dns_resolver
+            )
+        except EmailUndeliverableError as e:
+            # unexpected errors are raised with the original exception
+            # as the cause and shouldn't be remembered
+            if e.__cause__ is not None and not isinstance(
+                e.__cause__, dns.resolver.NXDOMAIN
+            ):
+                log.warning(f"Error checking deliverability of {domain}: {e}")
+                return None
+            return str(e)
+        # timeouts and failing nameservers are let through, but not cached
+        if "unknown-deliverability" in info:
+            return None
+        return ""
+
+    def check(self, domain: str, domain_i18n: Optional[str] = None) -> str:
+        """
+        Check whether a domain accepts email
+        :param domain: The ascii domain of the email address
+        :param domain_i18n: The domain as it should appear in errors
+        :return: An error if the domain doesn't accept email, "" otherwise
+        """
+        if domain in self.known_domains:
+            return ""
+        if self.cache is not None:
+            try:
+                error = self.cache.get(domain)
+                if error is not None:
+                    return error
+            except sqlite3.Error as e:
+                log.warning(f"Error reading from email domain cache: {e}")
+        error = self._resolve(domain, domain_i18n or domain)
+        if error is None:
+            return ""
+        if self.cache is not None:
+            try:
+                self.cache.set(
+                    domain, error, ttl=self.negative_ttl if error else None
+                )
+            except sqlite3.Error as e:
+                log.warning(f"Error writing to email domain cache: {e}")
+        return error
+
+
+DOMAIN_CHECKER = DomainDeliverabilityChecker(
+    cache=(
+        SqliteCache(
+            CACHE_PATH, namespace="email_domains", ttl=EMAIL_DOMAIN_CACHE_TTL
+        )
+        if EMAIL_DOMAIN_CACHE_TTL
+        else None
+    ),
+    known_domains=[f"{domain}.com" for domain in COMMON_DOMAINS],
+)
+
+
 def format_email(
-    email: Union[str, None], dns_check: bool = False
+    email: Union[str, None],
+    dns_check: bool = False,
+    domain_checker: Optional[DomainDeliverabilityChecker] = None,
 ) -> Dict[str, str]:
     """
     Format an email address to the standard
     :param email: The email address to format
+    :param dns_check: Whether to check that the domain accepts email
+    :param domain_checker: The checker to use (defaults to DOMAIN_CHECKER)
     :return: The formatted email address
     """
     # first perform basic cleaning on the email address before validating
@@ -251,7 +413,15 @@ def format_email(
     email = clean_email(email)
 
     try:
-        email_info = validate_email(email, check_deliverability=dns_check)
-        return {"email": email_info.normalized, "error": ""}
+        email_info = validate_email(email, check_deliverability=False)
     except EmailNotValidError as e:
         return {"email": email, "error": str(e)}
+
+    # check the domain separately, so that the answer can be cached
+    if dns_check:
+        error = (domain_checker or DOMAIN_CHECKER).check(
+            email_info.ascii_domain, email_info.domain
+        )
+        if error:
+            return {"email": email, "error": error}
+    return {"email": email_info.normalized, "error": ""}
@@ -3,7 +3,7 @@ import time
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Any, List, NewType, Union
+from typing import Any, Iterable, Iterator, List, NewType, Union
 
 log = logging.getLogger(__name__)
 
@@ -65,6 +65,23 @@ def to_list(value: Union[Any, List[Any]]) -> List[Any]:
     return [value]
 
 
+def chunk(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most ``size`` items
+    :param items: An iterable
+    :param size: The maximum size of each chunk
+    :yield list
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def to_bool(val: Union[str, bool]) -> bool:
     """
     Convert a string representation of truth to true or false.
@@ -1,7 +1,18 @@
+import asyncio
+import logging
+import sqlite3
 import argparse
-from typing import Dict, Optional
-from bam_core.lib.google import GoogleMaps
-from bam_core.lib.nyc_planning_labs import NycPlanningLabs
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from bam_core.lib.google import GoogleMaps, AsyncGoogleMaps
+from bam_core.lib.nyc_planning_labs import (
+    NycPlanningLabs,
+    AsyncNycPlanningLabs,
+)
+from bam_core.settings import CACHE_PATH, GEO_CACHE_TTL, GEO_CACHE_MAX_SIZE
+from bam_core.utils.cache import SqliteCache
+
+log = logging.getLogger(__name__)
 
 COMMON_ZIPCODE_MISTAKES = {
     "112007": "11207",
@@ -11,6 +22,27 @@ DEFAULT_BIN_RESPONSES = ["3000000", "1000000"]
 
 DEFAULT_CITY_STATE = "Brooklyn, NY"
 
+# pooled clients, shared by every call to format_address
+GMAPS = GoogleMaps()
+NYCPL = NycPlanningLabs()
+
+# runs the lookups which only depend on the cleaned address concurrently
+LOOKUP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="bam-geo"
+)
+
+# cache of formatted addresses, keyed on the address query
+GEO_CACHE = (
+    SqliteCache(
+        CACHE_PATH,
+        namespace="geo",
+        ttl=GEO_CACHE_TTL,
+        max_size=GEO_CACHE_MAX_SIZE,
+    )
+    if GEO_CACHE_TTL
+    else None
+)
+
 
 def _fix_address(address: str) -> str:
     """
@@ -35,27 +67,31 @@ def _fix_zip_code(zip_code: Optional[str]) -> str:
     return COMMON_ZIPCODE_MISTAKES.get(zip_code, zip_code)
 
 
-def format_address(
-    address: Optional[str] = None,
-    city_state: Optional[str] = "",
-    zipcode: Optional[str] = "",
-    strict_bounds: bool = True,
-) -> Dict[str, str]:
-    """
-    Format an address using the Google Maps API and the NYC Planning Labs API
-    Args:
-        address (str): The address to format
-        city_state (str): The city and state to use if the address is missing
-        zipcode (str): The zipcode to use if the address is missing
-        strict_bounds (bool): Whether to use strict bounds of 10 miles from Mayday
-    Returns:
-        Dict[str, str]: The formatted address, bin, accuracy, lat, lng, and plus_code
-    """
-    # connect to APIs
-    gmaps = GoogleMaps()
-    nycpl = NycPlanningLabs()
+def _cache_key(address_query: str, strict_bounds: bool) -> str:
+    return f"{address_query}|{int(strict_bounds)}"
+
+
+def _get_cached(cache_key: str) -> Optional[Dict[str, Any]]:
+    if GEO_CACHE is None:
+        return None
+    try:
+        return GEO_CACHE.get(cache_key)
+    except sqlite3.Error as e:
+        log.warning(f"Error reading from geo cache: {e}")
+        return None
+
 
-    response = {
+def _set_cached(cache_key: str, response: Dict[str, Any]) -> None:
+    if GEO_CACHE is None:
+        return
+    try:
+        GEO_CACHE.set(cache_key, response)
+    except sqlite3.Error as e:
+        log.warning(f"Error writing to geo cache: {e}")
+
+
+def _empty_response() -> Dict[str, Any]:
+    return {
         "cleaned_address": "",
         "bin": "",
         "cleaned_address_accuracy": "No result",
@@ -63,36 +99,50 @@ def format_address(
         "lat": None,
         "lng": None,
     }
-    # don't do anything for missing addresses
-    if not address or not address.strip():
-        return response
 
-    # common address mistakes/translations
+
+def _build_address_query(
+    address: str, city_state: Optional[str], zipcode: Optional[str]
+) -> str:
+    """
+    Fix common address mistakes/translations and format the address for query
+    """
     address = _fix_address(address)
+    city_state = (city_state or "").strip() or DEFAULT_CITY_STATE
+    zipcode = _fix_zip_code((zipcode or "").strip())
+    return f"{address.strip()}, {city_state} {zipcode}".strip().upper()
 
-    # format address for query
-    address_query = f"{address.strip()}, {city_state.strip() or DEFAULT_CITY_STATE} {_fix_zip_code(zipcode.strip())}".strip().upper()
 
-    # lookup address using Google Maps Places API
-    place_response = gmaps.get_place(
-        address_query, strict_bounds=strict_bounds
-    )
+def _parse_place_response(
+    place_response: List[Dict[str, Any]],
+    address_query: str,
+    response: Dict[str, Any],
+) -> Tuple[str, bool]:
+    """
+    Pick the place address from a Places API response, setting the accuracy
+    Returns:
+        Tuple[str, bool]: The place address and whether there was no result
+    """
     if len(place_response):
-        no_place_response = False
-        place_address = place_response[0]["description"]
         if "subpremise" in place_response[0]["types"]:
             response["cleaned_address_accuracy"] = "Apartment"
         elif "premise" in place_response[0]["types"]:
             response["cleaned_address_accuracy"] = "Building"
+        return place_response[0]["description"], False
 
     # if no results, use the original address
-    else:
-        no_place_response = True
-        place_address = address_query
+    return address_query, True
 
-    # lookup the cleaned address using the google maps address validation api
-    norm_address_result = gmaps.get_normalized_address(place_address)
 
+def _parse_normalized_address(
+    norm_address_result: Dict[str, Any],
+    place_address: str,
+    no_place_response: bool,
+    response: Dict[str, Any],
+) -> str:
+    """
+    Get the cleaned address from an address validation API response
+    """
     norm_address = norm_address_result.get("result", {})
     if no_place_response:
         # if no place response, use granularity from the norm address response
@@ -125,34 +175,174 @@ def format_address(
             cleaned_address = place_address.upper()
 
     # perform some standardization on the formatted address
-    cleaned_address = cleaned_address.replace(" # ", " APT ")
+    return cleaned_address.replace(" # ", " APT ")
+
+
+def _parse_bin(nycpl_response: Dict[str, Any]) -> str:
+    """
+    Get the BIN from a NYC Planning Labs geosearch response,
+    ignoring the default borough BINs
+    """
+    features = nycpl_response.get("features", [])
+    if len(features):
+        bin = (
+            features[0]
+            .get("properties", {})
+            .get("addendum", {})
+            .get("pad", {})
+            .get("bin", "")
+        )
+        if bin and str(bin) not in DEFAULT_BIN_RESPONSES:
+            return bin
+    return ""
+
+
+def _set_location(
+    response: Dict[str, Any],
+    lat: Optional[float],
+    lng: Optional[float],
+    plus_code: Optional[str],
+) -> None:
+    response["lat"] = lat
+    response["lng"] = lng
+    if plus_code is not None:
+        response["plus_code"] = plus_code
+
+
+def format_address(
+    address: Optional[str] = None,
+    city_state: Optional[str] = "",
+    zipcode: Optional[str] = "",
+    strict_bounds: bool = True,
+    gmaps: Optional[GoogleMaps] = None,
+    nycpl: Optional[NycPlanningLabs] = None,
+) -> Dict[str, str]:
+    """
+    Format an address using the Google Maps API and the NYC Planning Labs API
+    Args:
+        address (str): The address to format
+        city_state (str): The city and state to use if the address is missing
+        zipcode (str): The zipcode to use if the address is missing
+        strict_bounds (bool): Whether to use strict bounds of 10 miles from Mayday
+        gmaps (GoogleMaps): The Google Maps client to use (defaults to GMAPS)
+        nycpl (NycPlanningLabs): The NYC Planning Labs client to use (defaults to NYCPL)
+    Returns:
+        Dict[str, str]: The formatted address, bin, accuracy, lat, lng, and plus_code
+    """
+    gmaps = gmaps or GMAPS
+    nycpl = nycpl or NYCPL
+
+    response = _empty_response()
+    # don't do anything for missing addresses
+    if not address or not address.strip():
+        return response
+
+    address_query = _build_address_query(address, city_state, zipcode)
+
+    # return previously formatted addresses from the cache
+    cache_key = _cache_key(address_query, strict_bounds)
+    cached_response = _get_cached(cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    # lookup address using Google Maps Places API
+    place_response = gmaps.get_place(
+        address_query, strict_bounds=strict_bounds
+    )
+    place_address, no_place_response = _parse_place_response(
+        place_response, address_query, response
+    )
+
+    # lookup the cleaned address using the google maps address validation api
+    norm_address_result = gmaps.get_normalized_address(place_address)
+    cleaned_address = _parse_normalized_address(
+        norm_address_result, place_address, no_place_response, response
+    )
 
     # return the cleaned address and
     # lookup the bin using the nyc planning labs api
-    # only if the granularity is returned
+    # only if the granularity is returned,
+    # while geocoding the cleaned address
+    bin_lookup = None
     if response["cleaned_address_accuracy"] != "No result":
         response["cleaned_address"] = cleaned_address
-        nycpl_response = nycpl.search(cleaned_address)
-        features = nycpl_response.get("features", [])
-        if len(features):
-            bin = (
-                features[0]
-                .get("properties", {})
-                .get("addendum", {})
-                .get("pad", {})
-                .get("bin", "")
-            )
-            if bin and str(bin) not in DEFAULT_BIN_RESPONSES:
-                response["bin"] = bin
+        bin_lookup = LOOKUP_EXECUTOR.submit(nycpl.search, cleaned_address)
 
     # get plus code from GoogleMaps util
     lat, lng = gmaps.get_lat_lng(cleaned_address)
-    response["lat"] = lat
-    response["lng"] = lng
-    plus_code = gmaps.get_plus_code(lat, lng)
-    if plus_code is not None:
-        response["plus_code"] = plus_code
+    _set_location(response, lat, lng, gmaps.get_plus_code(lat, lng))
+    if bin_lookup is not None:
+        response["bin"] = _parse_bin(bin_lookup.result())
+    _set_cached(cache_key, response)
+    return response
+
+
+async def format_address_async(
+    address: Optional[str] = None,
+    city_state: Optional[str] = "",
+    zipcode: Optional[str] = "",
+    strict_bounds: bool = True,
+    gmaps: Optional[AsyncGoogleMaps] = None,
+    nycpl: Optional[AsyncNycPlanningLabs] = None,
+) -> Dict[str, str]:
+    """
+    An asyncio version of ``format_address`` which doesn't block the event
+    loop while waiting on the Google Maps and NYC Planning Labs APIs.
+    Args:
+        address (str): The address to format
+        city_state (str): The city and state to use if the address is missing
+        zipcode (str): The zipcode to use if the address is missing
+        strict_bounds (bool): Whether to use strict bounds of 10 miles from Mayday
+        gmaps (AsyncGoogleMaps): A (pooled) Google Maps client to use
+        nycpl (AsyncNycPlanningLabs): A (pooled) NYC Planning Labs client to use
+    Returns:
+        Dict[str, str]: The formatted address, bin, accuracy, lat, lng, and plus_code
+    """
+    response = _empty_response()
+    # don't do anything for missing addresses
+    if not address or not address.strip():
+        return response
+
+    # clients are bound to the running event loop,
+    # so only close the ones created for this call
+    if gmaps is None or nycpl is None:
+        async with AsyncGoogleMaps() as own_gmaps:
+            async with AsyncNycPlanningLabs() as own_nycpl:
+                return await format_address_async(
+                    address,
+                    city_state,
+                    zipcode,
+                    strict_bounds,
+                    gmaps or own_gmaps,
+                    nycpl or own_nycpl,
+                )
+
+    address_query = _build_address_query(address, city_state, zipcode)
+    cache_key = _cache_key(address_query, strict_bounds)
+    cached_response = _get_cached(cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    place_response = await gmaps.get_place(
+        address_query, strict_bounds=strict_bounds
+    )
+    place_address, no_place_response = _parse_place_response(
+        place_response, address_query, response
+    )
+    norm_address_result = await gmaps.get_normalized_address(place_address)
+    cleaned_address = _parse_normalized_address(
+        norm_address_result, place_address, no_place_response, response
+    )
+    lookups = [gmaps.get_lat_lng(cleaned_address)]
+    if response["cleaned_address_accuracy"] != "No result":
+        response["cleaned_address"] = cleaned_address
+        lookups.append(nycpl.search(cleaned_address))
 
+    (lat, lng), *nycpl_response = await asyncio.gather(*lookups)
+    _set_location(response, lat, lng, gmaps.get_plus_code(lat, lng))
+    if nycpl_response:
+        response["bin"] = _parse_bin(nycpl_response[0])
+    _set_cached(cache_key, response)
     return response
 
 
@@ -0,0 +1,148 @@
+"""
+A persisted set of the emails of every Mailjet contact, so syncs can diff
+against local state instead of paging through every contact on each run.
+
+The set is stored on S3 with a watermark: the highest Mailjet contact ID it
+has seen. Contact IDs only increase, so an incremental sync only fetches
+contacts newer than the watermark. A full sync runs periodically to pick up
+contacts which were deleted from Mailjet.
+"""
+
+import io
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Set
+
+from bam_core import settings
+from bam_core.lib.mailjet import Mailjet
+from bam_core.lib.s3 import S3
+from bam_core.utils.etc import now_utc
+from bam_core.utils.serde import jsongz_to_obj, obj_to_jsongz
+
+log = logging.getLogger(__name__)
+
+
+class MailjetContactCache(object):
+    """
+    The emails of every Mailjet contact, with a sync watermark
+    """
+
+    def __init__(
+        self,
+        mailjet: Mailjet,
+        s3: S3,
+        key: str = settings.MAILJET_CONTACT_CACHE_KEY,
+        full_sync_interval: int = settings.MAILJET_CONTACT_CACHE_FULL_SYNC_INTERVAL,
+    ):
+        self.mailjet = mailjet
+        self.s3 = s3
+        self.key = key
+        self.full_sync_interval = timedelta(seconds=full_sync_interval)
+        self.emails: Set[str] = set()
+        # the highest contact ID which has been synced
+        self.watermark = 0
+        self.full_synced_at: Optional[datetime] = None
+
+    def load(self) -> bool:
+        """
+        Load the cache from S3
+        :return bool: whether a cache was found
+        """
+        if not self.s3.exists(self.key):
+            return False
+        state = jsongz_to_obj(self.s3.get_contents(self.key))
+        self.emails = set(state["emails"])
+        self.watermark = state["watermark"]
+        self.full_synced_at = datetime.fromisoformat(state["full_synced_at"])
+        log.info(
+            f"Loaded {len(self.emails)} mailjet contacts up to ID {self.watermark}"
+        )
+        return True
+
+    def save(self) -> None:
+        """
+        Write the cache to S3
+        :return None
+        """
+        state = {
+            "watermark": self.watermark,
+            "full_synced_at": self.full_synced_at.isoformat(),
+            "emails": sorted(self.emails),
+        }
+        self.s3.upload_file_obj(
+            io.BytesIO(obj_to_jsongz(state)),
+            self.key,
+            mimetype="application/gzip",
+        )
+
+    def needs_full_sync(self) -> bool:
+        """
+        Check whether the cache is missing or too old to be updated
+        incrementally
+        :return bool
+        """
+        return (
+            self.full_synced_at is None
+            or now_utc() - self.full_synced_at >= self.full_sync_interval
+        )
+
+    def full_sync(self) -> int:
+        """
+        Replace the cache with every contact in Mailjet
+        :return int: the number of contacts
+        """
+        started_at = now_utc()
+        emails, watermark = set(), 0
+        for contact in self.mailjet.get_all_contacts():
+            emails.add(contact["Email"].lower())
+            watermark = max(watermark, contact["ID"])
+        self.emails, self.watermark = emails, watermark
+        self.full_synced_at = started_at
+        log.info(f"Fetched all {len(emails)} mailjet contacts")
+        return len(emails)
+
+    def incremental_sync(self) -> int:
+        """
+        Add the contacts created since the watermark
+        :return int: the number of new contacts
+        """
+        n_new = 0
+        watermark = self.watermark
+        for contact in self.mailjet.iter_contacts_since(self.watermark):
+            self.emails.add(contact["Email"].lower())
+            watermark = max(watermark, contact["ID"])
+            n_new += 1
+        self.watermark = watermark
+        log.info(
+            f"Fetched {n_new} mailjet contacts created since the last sync"
+        )
+        return n_new
+
+    def sync(self, full: bool = False) -> Set[str]:
+        """
+        Load the cache and bring it up to date with Mailjet
+        :param full: Force a full sync
+        :return set: the emails of every contact
+        """
+        self.load()
+        if full or self.needs_full_sync():
+            self.full_sync()
+        else:
+            self.incremental_sync()
+        return self.emails
+
+    def add(self, emails: Iterable[str]) -> None:
+        """
+        Record contacts which we've added to Mailjet ourselves.
+        The watermark is left alone, so the next incremental sync still
+        confirms them.
+        :param emails: The emails of the new contacts
+        :return None
+        """
+        self.emails.update(email.lower() for email in emails)
+
+    def __contains__(self, email: str) -> bool:
+        return email.lower() in self.emails
+
+    def __len__(self) -> int:
+        return len(self.emails)
@@ -1,11 +1,15 @@
 import logging
-from typing import List, Optional
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
 import phonenumbers
 
 log = logging.getLogger(__name__)
 
 MIN_PHONE_LENGTH = 7
 
+# the number of distinct phone numbers to memoize
+PHONE_CACHE_SIZE = 65536
+
 
 def _prepare_phone_number(phone_number: str) -> Optional[str]:
     """
@@ -43,29 +47,65 @@ def _prepare_phone_number(phone_number: str) -> Optional[str]:
     return prep_phone_number
 
 
-def is_international_phone_number(phone_number: str) -> bool:
+class PhoneNumberInfo(NamedTuple):
+    formatted: Optional[str]
+    is_valid: bool
+    is_intl: bool
+
+
+INVALID_PHONE_NUMBER = PhoneNumberInfo(None, False, False)
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def analyze_phone_number(phone_number: str) -> PhoneNumberInfo:
     """
-    Check if a phone number is international
-    :param phone_number: The phone number to check
-    :return: True if the phone number is international AND valid, False otherwise
+    Prepare, parse and validate a phone number once, memoizing the result
+    :param phone_number: The phone number to analyze
+    :return: The number formatted to the US standard (None if invalid),
+        whether it is valid, and whether it is international AND valid
     """
     try:
-        phone_number = _prepare_phone_number(phone_number)
-        if not phone_number:
-            return False
-        parsed_phone_number = phonenumbers.parse(phone_number, "US")
+        prep_phone_number = _prepare_phone_number(phone_number)
+        if not prep_phone_number:
+            return INVALID_PHONE_NUMBER
+        parsed_phone_number = phonenumbers.parse(prep_phone_number, "US")
         # if the phone number is not valid, we can't be sure if it's international or not.
         if not phonenumbers.is_valid_number(parsed_phone_number):
-            return False
-        return (
-            parsed_phone_number.country_code is not None
-            and parsed_phone_number.country_code != 1
+            return INVALID_PHONE_NUMBER
+        if (
+            not parsed_phone_number.country_code
+            or parsed_phone_number.country_code == 1
+        ):
+            return PhoneNumberInfo(
+                phonenumbers.format_number(
+                    parsed_phone_number,
+                    phonenumbers.PhoneNumberFormat.NATIONAL,
+                ),
+                True,
+                False,
+            )
+        return PhoneNumberInfo(
+            phonenumbers.format_number(
+                parsed_phone_number,
+                phonenumbers.PhoneNumberFormat.INTERNATIONAL,
+            ),
+            True,
+            True,
         )
     except Exception as e:
         log.warning(
-            f"Error checking if phone number {phone_number} is international because of {e}"
+            f"Error analyzing phone number {phone_number} because of {e}"
         )
-        return False
+        return INVALID_PHONE_NUMBER
+
+
+def is_international_phone_number(phone_number: str) -> bool:
+    """
+    Check if a phone number is international
+    :param phone_number: The phone number to check
+    :return: True if the phone number is international AND valid, False otherwise
+    """
+    return analyze_phone_number(phone_number).is_intl
 
 
 def format_phone_number(phone_number: str) -> Optional[str]:
@@ -74,29 +114,20 @@ def format_phone_number(phone_number: str) -> Optional[str]:
     :param phone_number: The phone number to format
     :return: The formatted phone number
     """
-    try:
-        phone_number = _prepare_phone_number(phone_number)
-        if not phone_number:
-            return None
-        parsed_phone_number = phonenumbers.parse(phone_number, "US")
-        if not phonenumbers.is_valid_number(parsed_phone_number):
-            return None
-        if (
-            not parsed_phone_number.country_code
-            or parsed_phone_number.country_code == 1
-        ):
-            return phonenumbers.format_number(
-                parsed_phone_number, phonenumbers.PhoneNumberFormat.NATIONAL
-            )
-        return phonenumbers.format_number(
-            parsed_phone_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL
-        )
+    return analyze_phone_number(phone_number).formatted
 
-    except Exception as e:
-        log.warning(
-            f"Error formatting phone number {phone_number} because of {e}"
-        )
-        return None
+
+def format_phone_numbers(phone_numbers: Iterable[str]) -> List[Optional[str]]:
+    """
+    Format many phone numbers to the US standard,
+    only parsing each distinct number once
+    :param phone_numbers: The phone numbers to format
+    :return: The formatted phone numbers (None for invalid numbers), in order
+    """
+    return [
+        analyze_phone_number(phone_number).formatted
+        for phone_number in phone_numbers
+    ]
 
 
 def extract_phone_numbers(text: str) -> List[str]:
@@ -0,0 +1,100 @@
+"""
+A thread-safe token bucket for pacing calls to rate limited APIs.
+
+The bucket allows ``limit`` units (eg: SMS segments) per ``window`` seconds,
+with bursts of up to ``limit`` units. When the API rejects a call as rate
+limited, ``throttle`` halves the rate and pauses the bucket; each
+successful call then restores a little of the rate, so a long run settles
+just under the real limit.
+"""
+
+import time
+import logging
+import threading
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+# tolerance for floating point error when refilling the bucket
+EPSILON = 1e-9
+
+
+class RateLimiter(object):
+    def __init__(
+        self,
+        limit: float,
+        window: float,
+        min_rate_fraction: float = 0.1,
+        recovery_fraction: float = 0.02,
+    ):
+        """
+        :param limit: The number of units allowed per window
+        :param window: The length of the window in seconds
+        :param min_rate_fraction: The lowest fraction of the configured
+            rate which throttling can reduce the rate to
+        :param recovery_fraction: The fraction of the configured rate
+            restored after each successful call
+        """
+        self.capacity = limit
+        self.max_rate = limit / window
+        self.min_rate = self.max_rate * min_rate_fraction
+        self.recovery = self.max_rate * recovery_fraction
+        self.rate = self.max_rate
+        self.tokens = float(limit)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - max(self.updated_at, self.paused_until), 0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = max(now, self.updated_at)
+
+    def acquire(self, units: float = 1) -> float:
+        """
+        Block until ``units`` are available, then take them
+        :param units: The number of units to take
+        :return float: The number of seconds spent waiting
+        """
+        units = min(units, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= units - EPSILON:
+                    self.tokens = max(self.tokens - units, 0.0)
+                    return waited
+                delay = (
+                    max(self.paused_until - now, 0)
+                    + (units - self.tokens) / self.rate
+                )
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down after a rate limited call: halve the rate, empty the
+        bucket and pause until ``retry_after`` seconds have passed
+        :param retry_after: The number of seconds the API asked us to wait
+        :return None
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.rate / 2, self.min_rate)
+            self.tokens = 0.0
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.paused_until = max(self.paused_until, now + pause)
+            self.updated_at = now
+            log.warning(
+                f"Rate limited, slowing down to {self.rate * 60:.1f} per minute"
+                f" and pausing for {pause:.1f} seconds"
+            )
+
+    def recover(self) -> None:
+        """
+        Restore some of the rate after a successful call
+        :return None
+        """
+        with self._lock:
+            self.rate = min(self.rate + self.recovery, self.max_rate)
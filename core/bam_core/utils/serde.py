@@ -3,7 +3,9 @@ All things related to serialization / deserialization
 This module should not import from other utils
 """
 
+import os
 import csv
+import shutil
 import io
 import gzip
 import zlib
@@ -13,11 +15,41 @@ from uuid import UUID
 from decimal import Decimal
 from inspect import isgenerator
 from collections import Counter
-from datetime import datetime
-from typing import Any, Dict, List, Union
+from datetime import date, datetime, time
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Tuple,
+    Union,
+)
 
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# the size of chunks to read when streaming files
+STREAM_CHUNK_SIZE = 64 * 1024
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
 
 # ///////////////////
 # CLASSES
@@ -29,32 +61,16 @@ class SmartJSONEncoder(json.JSONEncoder):
 
     item_separator = ","
     key_separator = ":"
+    refs = False
 
-    def default(self, obj: Any) -> str:
+    def default(self, obj: Any) -> Any:
         """Return a serializable for ``o``, or call the base implementation."""
-        if isinstance(obj, bytes):
-            return obj.decode("utf-8")
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, (datetime.date, datetime.datetime, datetime.time)):
-            return obj.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-        if isinstance(obj, UUID):
-            return str(obj)
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, set):
-            return list(obj)
-        if isgenerator(obj):
-            return list(obj)
-        if isinstance(obj, Counter):
-            return dict(obj)
         if self.refs and hasattr(obj, "to_ref"):
             return obj.to_ref()
-        if hasattr(obj, "to_dict"):
-            return obj.to_dict()
-        if hasattr(obj, "to_json"):
-            return obj.to_json()
-        return json.JSONEncoder.default(self, obj)
+        try:
+            return json_default(obj)
+        except TypeError:
+            return json.JSONEncoder.default(self, obj)
 
 
 # ///////////////////
@@ -62,6 +78,79 @@ class SmartJSONEncoder(json.JSONEncoder):
 # ///////////////////
 
 
+def json_default(obj: Any) -> Any:
+    """
+    Convert an object which isn't natively JSON-serializable
+    into one that is. Shared by all JSON backends.
+    """
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (date, time)):
+        return obj.strftime(DATETIME_FORMAT)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    if isgenerator(obj):
+        return list(obj)
+    if isinstance(obj, Counter):
+        return dict(obj)
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    raise TypeError(
+        f"Object of type {obj.__class__.__name__} is not JSON serializable"
+    )
+
+
+def _stdlib_dumps(o: object) -> str:
+    return SmartJSONEncoder().encode(o)
+
+
+def _stdlib_loads(s: Union[str, bytes]) -> object:
+    return json.loads(s)
+
+
+def _orjson_dumps(o: object) -> str:
+    return orjson.dumps(
+        o,
+        default=json_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    ).decode("utf-8")
+
+
+def _orjson_loads(s: Union[str, bytes]) -> object:
+    return orjson.loads(s)
+
+
+JSON_BACKENDS: Dict[str, Dict[str, Callable]] = {
+    "json": {"dumps": _stdlib_dumps, "loads": _stdlib_loads},
+}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = {"dumps": _orjson_dumps, "loads": _orjson_loads}
+
+# use the fastest available backend unless one is set explicitly
+JSON_BACKEND = os.getenv("BAM_JSON_BACKEND", "orjson")
+if JSON_BACKEND not in JSON_BACKENDS:
+    JSON_BACKEND = "json"
+
+
+def set_json_backend(name: str) -> None:
+    """
+    Set the backend used by ``obj_to_json`` and ``json_to_obj``
+    :param name: One of the keys of ``JSON_BACKENDS``
+    """
+    global JSON_BACKEND
+    if name not in JSON_BACKENDS:
+        raise NotImplementedError(
+            f"[set_json_backend] Backend {name} not available. Choose from: {', '.join(JSON_BACKENDS)}"
+        )
+    JSON_BACKEND = name
+
+
 def file_to_gz(infile, outfile=None):
     """
     gzip a file
@@ -70,10 +159,10 @@ def file_to_gz(infile, outfile=None):
         outfile = infile + ".gz"
     with gzip.open(outfile, "wb") as f_gz:
         with open(infile, "rb") as f_norm:
-            f_gz.write(f_norm.read())
+            shutil.copyfileobj(f_norm, f_gz, STREAM_CHUNK_SIZE)
 
 
-def gz_to_file(infile, outfile):
+def gz_to_file(infile, outfile=None):
     """
     un-gzip a file
     """
@@ -81,7 +170,7 @@ def gz_to_file(infile, outfile):
         outfile = infile.replace(".gz", "")
     with gzip.open(infile, "rb") as f_gz:
         with open(outfile, "wb") as f_norm:
-            f_gz.write(f_norm.read())
+            shutil.copyfileobj(f_gz, f_norm, STREAM_CHUNK_SIZE)
 
 
 def str_to_gz_fobj(s: str) -> io.BytesIO:
@@ -128,14 +217,14 @@ def json_to_obj(s: Any) -> object:
     # check for existing objects
     if isinstance(s, (dict, list)):
         return s
-    return json.loads(s)
+    return JSON_BACKENDS[JSON_BACKEND]["loads"](s)
 
 
 def obj_to_json(o: object) -> str:
     """
     obj > json string
     """
-    return SmartJSONEncoder().encode(o)
+    return JSON_BACKENDS[JSON_BACKEND]["dumps"](o)
 
 
 def jsongz_to_obj(b: bytes) -> object:
@@ -159,6 +248,109 @@ def obj_to_jsongz_fobj(o: object) -> io.BytesIO:
     return str_to_gz_fobj(obj_to_json(o))
 
 
+def ndjson_to_obj(s: Union[str, bytes]) -> List[object]:
+    """
+    newline-delimited json string > list of obj
+    """
+    if isinstance(s, bytes):
+        s = s.decode("utf-8")
+    return [json_to_obj(line) for line in s.splitlines() if line.strip()]
+
+
+def obj_to_ndjson(o: Iterable[object]) -> str:
+    """
+    list of obj > newline-delimited json string
+    """
+    return "".join(obj_to_json(item) + "\n" for item in o)
+
+
+def ndjsongz_to_obj(b: bytes) -> List[object]:
+    """
+    ndjson.gz > list of obj
+    """
+    return ndjson_to_obj(gz_to_str(b))
+
+
+def obj_to_ndjsongz(o: Iterable[object]) -> bytes:
+    """
+    list of obj > ndjson.gz
+    """
+    return str_to_gz(obj_to_ndjson(o))
+
+
+def str_to_zst(s: Union[str, bytes]) -> bytes:
+    """
+    string > zstd bytes
+    """
+    if isinstance(s, str):
+        s = s.encode("utf-8")
+    return zstandard.ZstdCompressor().compress(s)
+
+
+def zst_to_str(b: bytes) -> bytes:
+    """
+    zstd bytes > string
+    """
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(b)) as f:
+        return f.read()
+
+
+# msgpack extension type codes for types msgpack can't represent natively
+MSGPACK_EXT_DATETIME = 1
+MSGPACK_EXT_DATE = 2
+MSGPACK_EXT_SET = 3
+MSGPACK_EXT_DECIMAL = 4
+MSGPACK_EXT_UUID = 5
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(
+            MSGPACK_EXT_DATETIME, obj.isoformat().encode("utf-8")
+        )
+    if isinstance(obj, date):
+        return msgpack.ExtType(
+            MSGPACK_EXT_DATE, obj.isoformat().encode("utf-8")
+        )
+    if isinstance(obj, (set, frozenset)):
+        return msgpack.ExtType(MSGPACK_EXT_SET, obj_to_msgpack(list(obj)))
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(MSGPACK_EXT_DECIMAL, str(obj).encode("utf-8"))
+    if isinstance(obj, UUID):
+        return msgpack.ExtType(MSGPACK_EXT_UUID, obj.bytes)
+    return json_default(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == MSGPACK_EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("utf-8"))
+    if code == MSGPACK_EXT_DATE:
+        return date.fromisoformat(data.decode("utf-8"))
+    if code == MSGPACK_EXT_SET:
+        return set(msgpack_to_obj(data))
+    if code == MSGPACK_EXT_DECIMAL:
+        return Decimal(data.decode("utf-8"))
+    if code == MSGPACK_EXT_UUID:
+        return UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def msgpack_to_obj(b: bytes) -> object:
+    """
+    msgpack > obj
+    """
+    return msgpack.unpackb(
+        b, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+    )
+
+
+def obj_to_msgpack(o: object) -> bytes:
+    """
+    obj > msgpack
+    """
+    return msgpack.packb(o, use_bin_type=True, default=_msgpack_default)
+
+
 def pickle_to_obj(s: str) -> object:
     """
     pickle > obj
@@ -214,7 +406,7 @@ def obj_to_yaml(o: object) -> str:
     """
     obj > yaml string
     """
-    return yaml.dumps(o)
+    return yaml.dump(o)
 
 
 def yaml_to_obj(s: str) -> object:
@@ -255,8 +447,11 @@ def csv_to_obj(s: str) -> List[Dict[str, Any]]:
 SERIALIZERS = {
     "json.gz": obj_to_jsongz,
     "json": obj_to_json,
+    "ndjson": obj_to_ndjson,
+    "ndjson.gz": obj_to_ndjsongz,
     "pickle": obj_to_pickle,
     "pickle.gz": obj_to_picklegz,
+    "gz": str_to_gz,
     "zip": str_to_zip,
     "yaml": obj_to_yaml,
 }
@@ -264,27 +459,187 @@ SERIALIZERS = {
 DESERIALIZERS = {
     "json.gz": jsongz_to_obj,
     "json": json_to_obj,
+    "ndjson": ndjson_to_obj,
+    "ndjson.gz": ndjsongz_to_obj,
     "pickle": pickle_to_obj,
     "pickle.gz": picklegz_to_obj,
+    "gz": gz_to_str,
     "zip": zip_to_str,
     "yaml": yaml_to_obj,
 }
 
+if zstandard is not None:
+    SERIALIZERS.update(
+        {
+            "zst": str_to_zst,
+            "json.zst": lambda o: str_to_zst(obj_to_json(o)),
+            "ndjson.zst": lambda o: str_to_zst(obj_to_ndjson(o)),
+        }
+    )
+    DESERIALIZERS.update(
+        {
+            "zst": zst_to_str,
+            "json.zst": lambda b: json_to_obj(zst_to_str(b)),
+            "ndjson.zst": lambda b: ndjson_to_obj(zst_to_str(b)),
+        }
+    )
+
+if msgpack is not None:
+    SERIALIZERS.update(
+        {
+            "msgpack": obj_to_msgpack,
+            "msgpack.gz": lambda o: str_to_gz(obj_to_msgpack(o)),
+        }
+    )
+    DESERIALIZERS.update(
+        {
+            "msgpack": msgpack_to_obj,
+            "msgpack.gz": lambda b: msgpack_to_obj(gz_to_str(b)),
+        }
+    )
+
 
 def loads(s: Union[str, bytes], codec: str) -> object:
     """
-    Serialize a string into a python object
+    Deserialize a string into a python object
     param s: a string or bytearray to load
     """
-    if not codec in SERIALIZERS:
+    if not codec in DESERIALIZERS:
         raise NotImplementedError(f"[loads] Codec {codec} not supported")
-    return SERIALIZERS.get(codec)(s)
+    return DESERIALIZERS.get(codec)(s)
 
 
 def dumps(o: object, codec: str) -> Union[str, bytes]:
     """
-    Serialize a string into a python object
+    Serialize a python object into a string
     """
-    if not codec in DESERIALIZERS:
+    if not codec in SERIALIZERS:
         raise NotImplementedError(f"[dumps] Codec {codec} not supported")
-    return DESERIALIZERS.get(codec)(o)
+    return SERIALIZERS.get(codec)(o)
+
+
+# ///////////////////
+# STREAMS
+# ///////////////////
+
+
+def _open_gz_stream(fobj: BinaryIO, mode: str) -> BinaryIO:
+    return gzip.GzipFile(fileobj=fobj, mode=mode)
+
+
+def _open_zst_stream(fobj: BinaryIO, mode: str) -> BinaryIO:
+    if "r" in mode:
+        return zstandard.ZstdDecompressor().stream_reader(fobj, closefd=False)
+    return zstandard.ZstdCompressor().stream_writer(fobj, closefd=False)
+
+
+COMPRESSIONS = {
+    "gz": _open_gz_stream,
+}
+if zstandard is not None:
+    COMPRESSIONS["zst"] = _open_zst_stream
+
+STREAM_FORMATS = ("json", "ndjson")
+
+
+def _split_codec(codec: str) -> Tuple[str, Union[str, None]]:
+    """
+    Split a codec like ``ndjson.gz`` into its format and compression
+    """
+    fmt, _, compression = codec.partition(".")
+    if fmt not in STREAM_FORMATS or (
+        compression and compression not in COMPRESSIONS
+    ):
+        raise NotImplementedError(f"[stream] Codec {codec} not supported")
+    return fmt, compression or None
+
+
+def open_stream(fobj: BinaryIO, compression: str, mode: str = "rb"):
+    """
+    Wrap a binary file object (eg: an open file or an S3 response body)
+    with an incremental compressor / decompressor. Closing the returned
+    stream does not close ``fobj``.
+    :param fobj: A binary file object
+    :param compression: One of the keys of ``COMPRESSIONS``
+    :param mode: "rb" to decompress or "wb" to compress
+    """
+    if compression not in COMPRESSIONS:
+        raise NotImplementedError(
+            f"[open_stream] Compression {compression} not supported"
+        )
+    return COMPRESSIONS[compression](fobj, mode)
+
+
+def _iter_lines(fobj: BinaryIO) -> Generator[bytes, None, None]:
+    """
+    Iterate through lines of a binary stream, reading it in chunks
+    """
+    buffer = b""
+    while True:
+        chunk = fobj.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+def dump_stream(objs: Iterable[object], fobj: BinaryIO, codec: str) -> int:
+    """
+    Incrementally serialize an iterable of objects to a binary file object,
+    without building the full payload in memory.
+    ``json`` codecs write a single array, ``ndjson`` codecs one object per line.
+    :param objs: An iterable of objects
+    :param fobj: A binary file object to write to
+    :param codec: eg: ``json``, ``json.gz``, ``ndjson``, ``ndjson.zst``
+    :return int: the number of objects written
+    """
+    fmt, compression = _split_codec(codec)
+    out = open_stream(fobj, compression, "wb") if compression else fobj
+    n = 0
+    try:
+        if fmt == "json":
+            out.write(b"[")
+        for obj in objs:
+            line = obj_to_json(obj).encode("utf-8")
+            if fmt == "json":
+                out.write(b"," + line if n else line)
+            else:
+                out.write(line + b"\n")
+            n += 1
+        if fmt == "json":
+            out.write(b"]")
+    finally:
+        if compression:
+            out.close()
+    return n
+
+
+def load_stream(fobj: BinaryIO, codec: str) -> Generator[object, None, None]:
+    """
+    Incrementally deserialize objects from a binary file object.
+    ``ndjson`` codecs are read one line at a time, in constant memory.
+    ``json`` codecs are decompressed incrementally but parsed as a whole.
+    :param fobj: A binary file object to read from
+    :param codec: eg: ``json``, ``json.gz``, ``ndjson``, ``ndjson.zst``
+    :yield object
+    """
+    fmt, compression = _split_codec(codec)
+    stream = open_stream(fobj, compression, "rb") if compression else fobj
+    try:
+        if fmt == "ndjson":
+            for line in _iter_lines(stream):
+                if line.strip():
+                    yield json_to_obj(line)
+        else:
+            obj = json_to_obj(stream.read())
+            if isinstance(obj, list):
+                yield from obj
+            else:
+                yield obj
+    finally:
+        if compression:
+            stream.close()
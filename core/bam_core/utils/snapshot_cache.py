@@ -0,0 +1,319 @@
+"""
+A local, memory-mapped cache of Airtable snapshots.
+
+Each snapshot is stored as a single data file of compact record blobs
+(msgpack when available, otherwise JSON). A binary index file maps every
+record id to the offset and length of its blob in every snapshot it
+appears in. Index entries are fixed-width and sorted by
+record id and snapshot date, so a record's full history can be found with a
+binary search over the memory-mapped index, without loading every snapshot
+into memory.
+"""
+
+import os
+import mmap
+import struct
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bam_core.utils.serde import (
+    json_to_obj,
+    obj_to_json,
+    loads,
+    dumps,
+    SERIALIZERS,
+)
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_DATE_FIELD = "Snapshot Date"
+
+# Airtable record ids are "rec" followed by 14 characters
+RECORD_ID_SIZE = 17
+
+# record id, snapshot number, offset, length
+INDEX_ENTRY = struct.Struct(f"<{RECORD_ID_SIZE}sIQI")
+
+INDEX_FILENAME = "index.bin"
+SNAPSHOTS_FILENAME = "snapshots.json"
+DATA_FILE_EXT = ".records"
+
+# the codec used to serialize record blobs
+DEFAULT_CODEC = "msgpack" if "msgpack" in SERIALIZERS else "json"
+
+
+class SnapshotCache(Mapping):
+    """
+    A read-only mapping of record id > list of snapshots of that record,
+    sorted from oldest to newest, backed by memory-mapped files on disk.
+    """
+
+    def __init__(self, cache_dir: str, codec: str = DEFAULT_CODEC):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.codec = codec
+        self.snapshots = self._load_snapshots()
+        self._snapshot_names = {s["name"] for s in self.snapshots}
+        self._pending_entries = []
+        self._maps = {}
+        self._index = None
+        self._len = None
+
+    # ////////////////////////
+    #  Paths
+    # ///////////////////////
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.cache_dir, INDEX_FILENAME)
+
+    @property
+    def snapshots_path(self) -> str:
+        return os.path.join(self.cache_dir, SNAPSHOTS_FILENAME)
+
+    def _data_path(self, snapshot_name: str) -> str:
+        return os.path.join(self.cache_dir, snapshot_name + DATA_FILE_EXT)
+
+    # ////////////////////////
+    #  Writing
+    # ///////////////////////
+
+    def _load_snapshots(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.snapshots_path):
+            return []
+        with open(self.snapshots_path, "r") as f:
+            meta = json_to_obj(f.read())
+        # existing blobs must be read with the codec they were written with
+        self.codec = meta["codec"]
+        return meta["snapshots"]
+
+    def has_snapshot(self, snapshot_name: str) -> bool:
+        """
+        Check whether a snapshot has already been added to the cache
+        :param snapshot_name: The name of the snapshot (eg: its filename)
+        :return bool
+        """
+        return snapshot_name in self._snapshot_names
+
+    def add_snapshot(
+        self,
+        snapshot_name: str,
+        snapshot_date: str,
+        records: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Write a snapshot's records to the cache. The index is not updated
+        until ``save`` is called.
+        :param snapshot_name: The name of the snapshot (eg: its filename)
+        :param snapshot_date: The ISO date of the snapshot
+        :param records: The list of records in the snapshot
+        :return None
+        """
+        if self.has_snapshot(snapshot_name):
+            return
+        snapshot_number = len(self.snapshots)
+        offset = 0
+        with open(self._data_path(snapshot_name), "wb") as f:
+            for record in records:
+                record_id = record["id"].encode("utf-8")
+                if len(record_id) > RECORD_ID_SIZE:
+                    raise ValueError(f"Invalid record id: {record['id']}")
+                blob = dumps(record, self.codec)
+                if isinstance(blob, str):
+                    blob = blob.encode("utf-8")
+                f.write(blob)
+                self._pending_entries.append(
+                    (record_id, snapshot_number, offset, len(blob))
+                )
+                offset += len(blob)
+        self.snapshots.append({"name": snapshot_name, "date": snapshot_date})
+        self._snapshot_names.add(snapshot_name)
+
+    def save(self) -> None:
+        """
+        Merge newly added snapshots into the index and write it to disk.
+        :return None
+        """
+        if not self._pending_entries and os.path.exists(self.index_path):
+            return
+        entries = list(self._iter_entries()) + [
+            (record_id.ljust(RECORD_ID_SIZE, b"\x00"), *rest)
+            for record_id, *rest in self._pending_entries
+        ]
+        entries.sort(key=lambda e: (e[0], self.snapshots[e[1]]["date"], e[1]))
+        self._close_index()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for entry in entries:
+                f.write(INDEX_ENTRY.pack(*entry))
+        os.replace(tmp_path, self.index_path)
+        tmp_path = self.snapshots_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(
+                obj_to_json({"codec": self.codec, "snapshots": self.snapshots})
+            )
+        os.replace(tmp_path, self.snapshots_path)
+        self._pending_entries = []
+        self._len = None
+        log.debug(f"Wrote {len(entries)} entries to {self.index_path}")
+
+    # ////////////////////////
+    #  Reading
+    # ///////////////////////
+
+    def _open_index(self) -> Optional[mmap.mmap]:
+        if self._index is None:
+            if (
+                not os.path.exists(self.index_path)
+                or os.path.getsize(self.index_path) == 0
+            ):
+                return None
+            with open(self.index_path, "rb") as f:
+                self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._index
+
+    def _close_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _open_data(self, snapshot_number: int) -> mmap.mmap:
+        if snapshot_number not in self._maps:
+            path = self._data_path(self.snapshots[snapshot_number]["name"])
+            with open(path, "rb") as f:
+                self._maps[snapshot_number] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        return self._maps[snapshot_number]
+
+    def _entry_count(self) -> int:
+        index = self._open_index()
+        if index is None:
+            return 0
+        return len(index) // INDEX_ENTRY.size
+
+    def _entry(self, i: int) -> Tuple[bytes, int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._index, i * INDEX_ENTRY.size)
+
+    def _iter_entries(self) -> Iterator[Tuple[bytes, int, int, int]]:
+        index = self._open_index()
+        if index is None:
+            return
+        yield from INDEX_ENTRY.iter_unpack(index)
+
+    def _find(self, record_id: bytes) -> int:
+        """
+        Binary search the index for the first entry of a record id
+        """
+        lo, hi = 0, self._entry_count()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < record_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _read_record(
+        self, snapshot_number: int, offset: int, length: int
+    ) -> Dict[str, Any]:
+        data = self._open_data(snapshot_number)
+        record = loads(data[offset : offset + length], self.codec)
+        record[SNAPSHOT_DATE_FIELD] = self.snapshots[snapshot_number]["date"]
+        return record
+
+    def get_history(self, record_id: str) -> List[Dict[str, Any]]:
+        """
+        Get every snapshot of a record, sorted from oldest to newest
+        :param record_id: The Airtable record id
+        :return list
+        """
+        key = record_id.encode("utf-8").ljust(RECORD_ID_SIZE, b"\x00")
+        history = []
+        i = self._find(key)
+        n = self._entry_count()
+        while i < n:
+            entry_id, snapshot_number, offset, length = self._entry(i)
+            if entry_id != key:
+                break
+            history.append(self._read_record(snapshot_number, offset, length))
+            i += 1
+        return history
+
+    def get_last_snapshot(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent snapshot of a record
+        :param record_id: The Airtable record id
+        :return dict
+        """
+        key = record_id.encode("utf-8").ljust(RECORD_ID_SIZE, b"\x00")
+        i = self._find(key + b"\xff") - 1
+        if i < 0:
+            return None
+        entry_id, snapshot_number, offset, length = self._entry(i)
+        if entry_id != key:
+            return None
+        return self._read_record(snapshot_number, offset, length)
+
+    def _iter_groups(
+        self,
+    ) -> Iterator[Tuple[str, List[Tuple[int, int, int]]]]:
+        """
+        Scan the index once, yielding each record id with its entries
+        """
+        current_id, group = None, []
+        for entry_id, *location in self._iter_entries():
+            if entry_id != current_id:
+                if group:
+                    yield current_id.rstrip(b"\x00").decode("utf-8"), group
+                current_id, group = entry_id, []
+            group.append(location)
+        if group:
+            yield current_id.rstrip(b"\x00").decode("utf-8"), group
+
+    def iter_last_snapshots(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield the most recent snapshot of every record
+        :yield tuple
+        """
+        for record_id, group in self._iter_groups():
+            yield record_id, self._read_record(*group[-1])
+
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        for record_id, group in self._iter_groups():
+            yield record_id, [self._read_record(*loc) for loc in group]
+
+    def close(self) -> None:
+        """
+        Close all memory-mapped files
+        """
+        for data in self._maps.values():
+            data.close()
+        self._maps = {}
+        self._close_index()
+
+    def __enter__(self) -> "SnapshotCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # ////////////////////////
+    #  Mapping Interface
+    # ///////////////////////
+
+    def __getitem__(self, record_id: str) -> List[Dict[str, Any]]:
+        history = self.get_history(record_id)
+        if not history:
+            raise KeyError(record_id)
+        return history
+
+    def __iter__(self) -> Iterator[str]:
+        for record_id, _ in self._iter_groups():
+            yield record_id
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = sum(1 for _ in self._iter_groups())
+        return self._len
@@ -0,0 +1,102 @@
+import json
+import time
+import argparse
+import threading
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bam_core.lib.mailjet import Mailjet
+
+# Benchmark a full pull of Mailjet contacts against a local stub of the
+# contact endpoint, which responds after a fixed delay, at several levels
+# of concurrency.
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Mailjet.get_all_contacts against a local stub"
+    )
+    parser.add_argument(
+        "-n",
+        "--num-contacts",
+        type=int,
+        default=50000,
+        help="The number of contacts served by the stub",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.2,
+        help="The number of seconds the stub takes to respond",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="The levels of concurrency to benchmark",
+    )
+    return parser
+
+
+def make_handler(num_contacts: int, latency: float):
+    class ContactsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            time.sleep(latency)
+            if "countOnly" in query:
+                data = {"Count": num_contacts, "Data": []}
+            else:
+                offset = int(query["Offset"][0])
+                limit = int(query["Limit"][0])
+                ids = range(offset, min(offset + limit, num_contacts))
+                data = {
+                    "Data": [
+                        {"ID": i, "Email": f"person{i}@gmail.com"} for i in ids
+                    ]
+                }
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ContactsHandler
+
+
+def main():
+    args = get_parser().parse_args()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(args.num_contacts, args.latency)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    mailjet = Mailjet(
+        api_key="key",
+        api_secret="secret",
+        base_url=f"http://{host}:{port}/v3/REST/",
+        pool_size=max(args.concurrency),
+    )
+    print(
+        f"Fetching {args.num_contacts} contacts"
+        f" with {args.latency * 1000:.0f}ms of latency per request"
+    )
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        contacts = mailjet.get_all_contacts(concurrency=concurrency)
+        n = sum(1 for _ in contacts)
+        elapsed = time.perf_counter() - start
+        print(f"concurrency {concurrency:>2}: {n} contacts in {elapsed:6.2f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
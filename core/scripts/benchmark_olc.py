@@ -0,0 +1,55 @@
+import random
+import argparse
+import timeit
+
+from bam_core.lib import olc
+from bam_core.constants import MAYDAY_LOCATION
+
+# Benchmark plus-coding a table of synthetic household locations around
+# Mayday, one at a time with olc.encode versus all at once with
+# olc.encode_many.
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Benchmark bam_core.lib.olc")
+    parser.add_argument(
+        "-n",
+        "--num-locations",
+        type=int,
+        default=100000,
+        help="The number of synthetic locations",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="The number of times to repeat each benchmark",
+    )
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    lats = [
+        MAYDAY_LOCATION["lat"] + random.uniform(-0.1, 0.1)
+        for _ in range(args.num_locations)
+    ]
+    lngs = [
+        MAYDAY_LOCATION["lng"] + random.uniform(-0.1, 0.1)
+        for _ in range(args.num_locations)
+    ]
+    scalar = lambda: [olc.encode(lat, lng) for lat, lng in zip(lats, lngs)]
+    vectorized = lambda: olc.encode_many(lats, lngs)
+    assert scalar() == vectorized()
+    print(f"Benchmarking {args.num_locations} locations x {args.repeat} runs")
+    for name, fn in [("encode", scalar), ("encode_many", vectorized)]:
+        elapsed = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(
+            f"{name:>11}: {elapsed * 1000:8.1f}ms"
+            f" ({elapsed / args.num_locations * 1e6:.2f}us per location)"
+        )
+
+
+if __name__ == "__main__":
+    main()
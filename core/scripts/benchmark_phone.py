@@ -0,0 +1,97 @@
+import random
+import argparse
+import timeit
+
+from bam_core.utils import phone
+
+# Benchmark phone number normalization on synthetic form submissions,
+# where the same households resubmit the same numbers in different formats.
+
+FORMATS = [
+    "{area}{exchange}{line}",
+    "({area}) {exchange}-{line}",
+    "+1 {area} {exchange} {line}",
+    "1{area}-{exchange}-{line}",
+    " {area}.{exchange}.{line} #invalido",
+]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark bam_core.utils.phone"
+    )
+    parser.add_argument(
+        "-n",
+        "--num-numbers",
+        type=int,
+        default=100000,
+        help="The number of synthetic phone numbers",
+    )
+    parser.add_argument(
+        "-u",
+        "--num-unique",
+        type=int,
+        default=20000,
+        help="The number of distinct households among those numbers",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="The number of times to repeat each benchmark",
+    )
+    return parser
+
+
+def make_numbers(num_numbers: int, num_unique: int) -> list:
+    households = [
+        {
+            "area": random.choice(["929", "347", "718", "917", "646"]),
+            "exchange": f"{random.randint(200, 999)}",
+            "line": f"{random.randint(0, 9999):04d}",
+        }
+        for _ in range(num_unique)
+    ]
+    return [
+        random.choice(FORMATS).format(**random.choice(households))
+        for _ in range(num_numbers)
+    ]
+
+
+def uncached(numbers: list) -> list:
+    # what clean_record did before: parse each number twice, every time
+    analyze = phone.analyze_phone_number.__wrapped__
+    return [(analyze(n).formatted, analyze(n).is_intl) for n in numbers]
+
+
+def cached(numbers: list) -> list:
+    # start cold every run so the first parse of each number is counted
+    phone.analyze_phone_number.cache_clear()
+    return [
+        (info.formatted, info.is_intl)
+        for info in map(phone.analyze_phone_number, numbers)
+    ]
+
+
+def main():
+    args = get_parser().parse_args()
+    random.seed(0)
+    numbers = make_numbers(args.num_numbers, args.num_unique)
+    print(
+        f"Benchmarking {args.num_numbers} numbers"
+        f" ({len(set(numbers))} distinct) x {args.repeat} runs"
+    )
+    assert uncached(numbers) == cached(numbers)
+    for name, fn in [("uncached", uncached), ("cached", cached)]:
+        elapsed = min(
+            timeit.repeat(lambda: fn(numbers), number=1, repeat=args.repeat)
+        )
+        print(
+            f"{name:>8}: {elapsed * 1000:8.1f}ms"
+            f" ({elapsed / args.num_numbers * 1e6:.2f}us per number)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import random
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from bam_core.utils import serde
+from bam_core.constants import (
+    PHONE_FIELD,
+    DATE_SUBMITTED_FIELD,
+    EG_REQUESTS_FIELD,
+    EG_STATUS_FIELD,
+    KITCHEN_REQUESTS_FIELD,
+)
+
+# Benchmark serialization / deserialization on synthetic
+# Airtable snapshots, which look like the files written by
+# SnapshotAirtableViews: first each JSON backend, then each
+# codec used for internal caches.
+
+CACHE_CODECS = ["json", "pickle", "msgpack"]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark JSON backends and codecs in bam_core.utils.serde"
+    )
+    parser.add_argument(
+        "-n",
+        "--num-records",
+        type=int,
+        default=20000,
+        help="The number of records in the synthetic snapshot",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="The number of times to repeat each benchmark",
+    )
+    return parser
+
+
+def make_record(i: int) -> dict:
+    submitted = datetime(2023, 1, 1) + timedelta(minutes=i)
+    return {
+        "id": f"rec{i:014d}",
+        "createdTime": submitted.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "First Name": random.choice(["María", "José", "Wei", "Ana", "John"]),
+        PHONE_FIELD: f"(929) {random.randint(200, 999)}-{i % 10000:04d}",
+        "Email": f"person{i}@gmail.com",
+        DATE_SUBMITTED_FIELD: submitted.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        EG_REQUESTS_FIELD: random.sample(
+            ["Pads", "Baby Diapers", "Clothing", "Soap & Shower Products"], 2
+        ),
+        EG_STATUS_FIELD: random.sample(
+            ["Pads Delivered", "Baby Diapers Delivered", "Timeout"], 1
+        ),
+        KITCHEN_REQUESTS_FIELD: ["Pots & Pans", "Plates"],
+        "Notes": "Necesita entrega, llamar antes de las 5pm. " * 3,
+        "Last Modified": submitted.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+    }
+
+
+def main():
+    args = get_parser().parse_args()
+    records = [make_record(i) for i in range(args.num_records)]
+    print(f"Benchmarking {args.num_records} records x {args.repeat} runs")
+    default_backend = serde.JSON_BACKEND
+    print("JSON backends:")
+    for name in serde.JSON_BACKENDS:
+        serde.set_json_backend(name)
+        benchmark(name, records, "json", args.repeat)
+    serde.set_json_backend(default_backend)
+    print(f"Codecs (JSON backend: {default_backend}):")
+    for codec in CACHE_CODECS:
+        if codec not in serde.SERIALIZERS:
+            print(f"{codec:>8}: not installed")
+            continue
+        benchmark(codec, records, codec, args.repeat)
+
+
+def benchmark(name: str, records: list, codec: str, repeat: int):
+    contents = serde.dumps(records, codec)
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    dumps = min(
+        timeit.repeat(
+            lambda: serde.dumps(records, codec), number=1, repeat=repeat
+        )
+    )
+    loads = min(
+        timeit.repeat(
+            lambda: serde.loads(contents, codec), number=1, repeat=repeat
+        )
+    )
+    print(
+        f"{name:>8}: dumps {dumps * 1000:8.1f}ms"
+        f" | loads {loads * 1000:8.1f}ms"
+        f" | size {len(contents) / 1e6:.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
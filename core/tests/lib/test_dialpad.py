@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock, patch
+
+from bam_core.lib.dialpad import Dialpad
+
+
+def _response(status_code, data, headers={}):
+    response = MagicMock(
+        status_code=status_code, ok=status_code < 400, headers=headers
+    )
+    response.json.return_value = data
+    return response
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@patch("bam_core.lib.dialpad.requests.post")
+def test_send_sms_retries_rate_limited_segments(mock_post):
+    clock = FakeClock()
+    mock_post.side_effect = [
+        _response(
+            429, {"error": {"message": "Slow down"}}, {"Retry-After": "2"}
+        ),
+        _response(200, {"id": 1}),
+        _response(200, {"id": 2}),
+    ]
+    rows = [{"First Name": "Ana María", "Phone Number": "(929) 555-0100"}]
+    message = "Hola [FIRST_NAME]! " + "palabra " * 25
+    with patch("bam_core.utils.rate_limit.time", clock):
+        dialpad = Dialpad(api_token="token", user_id="1", logger=MagicMock())
+        sent = list(dialpad.send_sms(rows, message))
+    assert sent == rows
+    assert mock_post.call_count == 3
+    payloads = [c.kwargs["json"] for c in mock_post.call_args_list]
+    assert {p["to_numbers"] for p in payloads} == {"+19295550100"}
+    assert payloads[0]["text"] == payloads[1]["text"]
+    assert payloads[1]["text"].startswith("Hola Ana!")
+    # paused for the Retry-After header, at half the rate
+    assert dialpad.rate_limiter.rate < dialpad.rate_limiter.max_rate
+    assert clock.sleeps[0] >= 2
+
+
+@patch("bam_core.lib.dialpad.requests.post")
+def test_send_sms_testing_does_not_send(mock_post):
+    dialpad = Dialpad(logger=MagicMock())
+    household = MagicMock(phone_number="9295550100")
+    household.name = "Ana"
+    households = [household]
+    assert list(dialpad.send_sms_v2(households, "Hi", testing=True)) == (
+        households
+    )
+    mock_post.assert_not_called()
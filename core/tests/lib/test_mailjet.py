@@ -0,0 +1,198 @@
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from bam_core.lib.mailjet import Mailjet
+
+
+def _response(status_code, data):
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = data
+    return response
+
+
+@patch("bam_core.lib.mailjet.time.sleep")
+@patch.object(Mailjet, "_make_request")
+def test_add_many_contacts_to_lists(mock_request, mock_sleep):
+    mock_request.side_effect = [
+        _response(201, {"Data": [{"JobID": 42}]}),
+        _response(200, {"Data": [{"Status": "In Progress"}]}),
+        _response(200, {"Data": [{"Status": "Completed", "Count": 2}]}),
+    ]
+    mailjet = Mailjet()
+    job = mailjet.add_many_contacts_to_lists(
+        [{"email": "a@gmail.com", "firstname": "A"}, {"email": "b@gmail.com"}],
+        ["Volunteers", "All Contacts"],
+    )
+    assert job["Count"] == 2
+    method, endpoint = mock_request.call_args_list[0].args
+    assert (method, endpoint) == ("POST", "contact/managemanycontacts")
+    assert mock_request.call_args_list[0].kwargs["data"] == {
+        "Contacts": [
+            {"Email": "a@gmail.com", "Properties": {"firstname": "A"}},
+            {"Email": "b@gmail.com", "Properties": {}},
+        ],
+        "ContactsLists": [
+            {"ListID": 10331731, "Action": "addnoforce"},
+            {"ListID": 10332279, "Action": "addnoforce"},
+        ],
+    }
+    assert mock_request.call_args_list[1].args == (
+        "GET",
+        "contact/managemanycontacts/42",
+    )
+    assert mock_sleep.call_count == 1
+
+
+@patch.object(Mailjet, "_make_request")
+def test_add_many_contacts_to_lists_job_error(mock_request):
+    mock_request.side_effect = [
+        _response(201, {"Data": [{"JobID": 42}]}),
+        _response(200, {"Data": [{"Status": "Error", "Error": "Bad"}]}),
+    ]
+    with pytest.raises(Exception, match="Job 42 failed: Bad"):
+        Mailjet().add_many_contacts_to_lists(
+            [{"email": "a@gmail.com"}], ["Volunteers"]
+        )
+
+
+def test_manage_many_contacts_invalid_list():
+    with pytest.raises(Exception, match="Invalid list name"):
+        Mailjet().manage_many_contacts([{"email": "a@gmail.com"}], ["Nope"])
+
+
+@patch.object(Mailjet, "_make_request")
+def test_iter_contacts_since(mock_request):
+    mock_request.side_effect = [
+        _response(200, {"Data": [{"ID": 5}, {"ID": 4}]}),
+        _response(200, {"Data": [{"ID": 3}, {"ID": 2}]}),
+    ]
+    contacts = list(Mailjet().iter_contacts_since(3, limit=2))
+    assert [c["ID"] for c in contacts] == [5, 4]
+    assert mock_request.call_count == 2
+    assert mock_request.call_args_list[1].kwargs["params"] == {
+        "Limit": 2,
+        "Offset": 2,
+        "Sort": "ID DESC",
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.server.requests.append((self.path, self.client_address))
+        if self.server.route:
+            status, headers, body = self.server.route(self.path)
+        else:
+            status, headers, body = self.server.responses.pop(0)
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests, server.responses, server.route = [], [], None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _stub_mailjet(server, **kwargs):
+    host, port = server.server_address
+    return Mailjet(
+        api_key="key",
+        api_secret="secret",
+        base_url=f"http://{host}:{port}/v3/REST/",
+        **kwargs,
+    )
+
+
+@patch("bam_core.lib.mailjet.time.sleep")
+def test_make_request_retries_failed_responses(mock_sleep, stub_server):
+    stub_server.responses = [
+        (503, {}, {"ErrorMessage": "Unavailable"}),
+        (429, {"Retry-After": "3"}, {"ErrorMessage": "Too many requests"}),
+        (200, {}, {"Data": [{"ID": 1, "Email": "a@gmail.com"}]}),
+        (200, {}, {"Data": [{"ID": 1, "Email": "a@gmail.com"}]}),
+    ]
+    mailjet = _stub_mailjet(stub_server, backoff=0.5)
+    assert mailjet.get_contacts(limit=1) == [{"ID": 1, "Email": "a@gmail.com"}]
+    assert mailjet.get_contacts(limit=1, offset=1)
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 0.5
+    # the rate limit header takes precedence over the backoff
+    assert delays[1] == 3
+    # every request reused the same connection
+    assert len({address for _, address in stub_server.requests}) == 1
+    stats = mailjet.get_latency_stats()
+    assert stats["contact"]["count"] == 4
+    assert stats["contact"]["mean"] <= stats["contact"]["max"]
+
+
+@patch("bam_core.lib.mailjet.time.sleep")
+def test_make_request_gives_up_after_max_retries(mock_sleep, stub_server):
+    stub_server.responses = [(500, {}, {"ErrorMessage": "Oops"})] * 3
+    mailjet = _stub_mailjet(stub_server, max_retries=2)
+    with pytest.raises(Exception, match="Oops"):
+        mailjet.get_job_status(42)
+    assert mock_sleep.call_count == 2
+    assert (
+        mailjet.get_latency_stats()["contact/managemanycontacts/{id}"]["count"]
+        == 3
+    )
+
+
+def _contacts_route(n_contacts, n_created=0):
+    """
+    Serve contacts like the mailjet api, with some created after counting
+    """
+
+    def route(path):
+        query = {k: v[0] for k, v in parse_qs(urlparse(path).query).items()}
+        if "countOnly" in query:
+            return 200, {}, {"Count": n_contacts, "Data": []}
+        offset, limit = int(query["Offset"]), int(query["Limit"])
+        ids = range(offset, min(offset + limit, n_contacts + n_created))
+        data = [{"ID": i, "Email": f"Person{i}@gmail.com"} for i in ids]
+        return 200, {}, {"Count": len(data), "Data": data}
+
+    return route
+
+
+def test_get_all_contacts_fetches_pages_concurrently(stub_server):
+    stub_server.route = _contacts_route(25, n_created=3)
+    mailjet = _stub_mailjet(stub_server)
+    contacts = mailjet.get_all_contacts(limit=5, concurrency=3)
+    assert [c["ID"] for c in contacts] == list(range(28))
+    # a count, 5 counted pages, then a page of contacts created since
+    assert mailjet.get_latency_stats()["contact"]["count"] == 7
+    emails = list(mailjet.get_all_emails())
+    assert emails[:2] == ["person0@gmail.com", "person1@gmail.com"]
+
+
+def test_get_all_contacts_without_contacts(stub_server):
+    stub_server.route = _contacts_route(0)
+    assert list(_stub_mailjet(stub_server).get_all_contacts()) == []
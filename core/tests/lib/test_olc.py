@@ -1,3 +1,7 @@
+import random
+
+import pytest
+
 from bam_core.lib import olc
 
 
@@ -11,3 +15,27 @@ def test_olc_encode():
 def test_olc_encode_with_nulls():
     plus_code = olc.encode(None, 45.0)
     assert plus_code is None
+
+
+def test_olc_decode():
+    area = olc.decode("87G7PX7V+")
+    assert area == olc.CodeArea(40.7125, -74.0075, 40.715, -74.005)
+    assert area.south <= 40.7128 < area.north
+    assert area.west <= -74.0060 < area.east
+    with pytest.raises(ValueError):
+        olc.decode("87G7PX7")
+
+
+@pytest.mark.skipif(olc.np is None, reason="numpy is not installed")
+def test_olc_encode_many_equivalence():
+    rng = random.Random(0)
+    lats = [rng.uniform(-95, 95) for _ in range(10000)]
+    lngs = [rng.uniform(-600, 600) for _ in range(10000)]
+    # edge cases: poles, antimeridian and missing values
+    lats += [90, -90, 40.7128, None, 0, 40.7128]
+    lngs += [180, -180, -74.0060, -74.0060, -74.0060, None]
+    assert olc.encode_many(lats, lngs) == [
+        olc.encode(lat, lng) for lat, lng in zip(lats, lngs)
+    ]
+    # NaN (eg: from a DataFrame) is also treated as missing
+    assert olc.encode_many([float("nan")], [-74.0060]) == [None]
@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from bam_core.lib.s3 import S3
+
+
+@patch("bam_core.lib.s3.requests.delete")
+def test_flush_cdn_purge_queue_dedupes_prefixes(mock_delete):
+    s3 = S3()
+    s3.queue_cdn_purge("website-data/open-requests.json")
+    s3.queue_cdn_purge("website-data/fulfilled-requests.json")
+    s3.queue_cdn_purge("website-data/open-requests.json")
+    assert s3.flush_cdn_purge_queue() is True
+    assert mock_delete.call_count == 1
+    assert mock_delete.call_args.kwargs["json"] == {
+        "files": [
+            "website-data/open-requests.json*",
+            "website-data/fulfilled-requests.json*",
+        ]
+    }
+    assert s3.cdn_purge_queue == {}
+
+
+@patch("bam_core.lib.s3.requests.delete")
+def test_flush_cdn_purge_queue_skips_empty_queue(mock_delete):
+    s3 = S3()
+    assert s3.flush_cdn_purge_queue() is False
+    mock_delete.assert_not_called()
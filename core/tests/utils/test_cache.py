@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from bam_core.utils.cache import SqliteCache
+
+
+def test_sqlite_cache_get_set(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite"), namespace="test")
+    assert cache.get("foo") is None
+    cache.set("foo", {"bar": [1, 2]})
+    assert cache.get("foo") == {"bar": [1, 2]}
+    # another instance (eg: another worker) shares the same entries
+    other = SqliteCache(str(tmp_path / "cache.sqlite"), namespace="test")
+    assert other.get("foo") == {"bar": [1, 2]}
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 1,
+        "hit_rate": 2 / 3,
+        "size": 1,
+    }
+    # namespaces are isolated
+    assert (
+        SqliteCache(str(tmp_path / "cache.sqlite"), "other").get("foo") is None
+    )
+
+
+def test_sqlite_cache_ttl(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    with patch("bam_core.utils.cache.time.time", return_value=1000):
+        cache.set("foo", "bar")
+    with patch("bam_core.utils.cache.time.time", return_value=1059):
+        assert cache.get("foo") == "bar"
+    with patch("bam_core.utils.cache.time.time", return_value=1061):
+        assert cache.get("foo") is None
+
+
+def test_sqlite_cache_lru_eviction(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite"), max_size=2)
+    with patch("bam_core.utils.cache.time.time") as mock_time:
+        mock_time.return_value = 1
+        cache.set("a", 1)
+        mock_time.return_value = 2
+        cache.set("b", 2)
+        mock_time.return_value = 3
+        assert cache.get("a") == 1
+        mock_time.return_value = 4
+        cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
@@ -1,4 +1,19 @@
-from bam_core.utils.email import format_email
+import re
+import random
+from string import punctuation
+from types import SimpleNamespace
+
+import dns.exception
+import dns.resolver
+
+from bam_core.utils.cache import SqliteCache
+from bam_core.utils.email import (
+    format_email,
+    clean_email,
+    DomainDeliverabilityChecker,
+    COMMON_DOMAIN_MISSPELLINGS,
+    COMMON_DOMAINS,
+)
 
 
 def test_spaces_in_email():
@@ -120,6 +135,70 @@ def test_dns_check():
     assert result["error"] == "The domain name gmailll69.com does not exist."
 
 
+class StubResolver(object):
+    """
+    A local stand-in for a dnspython resolver
+    """
+
+    def __init__(self, mx_records):
+        self.mx_records = mx_records
+        self.lookups = []
+
+    def resolve(self, domain, rdtype):
+        self.lookups.append((domain, rdtype))
+        if domain == "slow.org":
+            raise dns.exception.Timeout()
+        if domain not in self.mx_records:
+            raise dns.resolver.NXDOMAIN()
+        return [
+            SimpleNamespace(preference=10, exchange=exchange)
+            for exchange in self.mx_records[domain]
+        ]
+
+
+def test_dns_check_cached(tmp_path):
+    """
+    Test that domain deliverability is cached, including failures
+    """
+    resolver = StubResolver({"example.org": ["mx.example.org."]})
+    checker = DomainDeliverabilityChecker(
+        cache=SqliteCache(str(tmp_path / "cache.sqlite"), "email_domains"),
+        dns_resolver=resolver,
+        known_domains=["gmail.com"],
+    )
+    for _ in range(2):
+        assert format_email(
+            "person@example.org", dns_check=True, domain_checker=checker
+        ) == {"email": "person@example.org", "error": ""}
+        assert format_email(
+            "person@gmailll69.com", dns_check=True, domain_checker=checker
+        ) == {
+            "email": "person@gmailll69.com",
+            "error": "The domain name gmailll69.com does not exist.",
+        }
+        assert format_email(
+            "person@gmail.com", dns_check=True, domain_checker=checker
+        ) == {"email": "person@gmail.com", "error": ""}
+    assert resolver.lookups == [
+        ("example.org", "MX"),
+        ("gmailll69.com", "MX"),
+    ]
+
+
+def test_dns_check_timeout_not_cached(tmp_path):
+    """
+    Test that domains which time out are let through, but checked again
+    """
+    resolver = StubResolver({})
+    checker = DomainDeliverabilityChecker(
+        cache=SqliteCache(str(tmp_path / "cache.sqlite"), "email_domains"),
+        dns_resolver=resolver,
+    )
+    for _ in range(2):
+        assert checker.check("slow.org") == ""
+    assert len(resolver.lookups) == 2
+
+
 def test_multiple_errors():
     email = "FOOO bar@gmeil.con"
     result = format_email(email)
@@ -269,3 +348,164 @@ def test_gmail_es():
     email = "test@gmail.es"
     result = format_email(email)
     assert result["email"] == "test@gmail.com"
+
+
+def _legacy_clean_email(email: str) -> str:
+    """
+    clean_email before its rules were compiled, for the equivalence test
+    """
+    # remove whitespace
+    email = email.replace(" ", "").strip()
+
+    # remove all trailing punctuation
+    while email[-1] in punctuation:
+        email = email[:-1]
+
+    # check for mailto:
+    if email.startswith("mailto:"):
+        email = email[7:]
+
+    # check for .vom typos
+    if email.endswith(".vom"):
+        email = email[:-4] + ".com"
+
+    # check for .col typos
+    if email.endswith(".col"):
+        email = email[:-4] + ".com"
+
+    # check for .comp typos
+    if email.endswith(".comp"):
+        email = email[:-5] + ".com"
+
+    # check for .como typos
+    if email.endswith(".como"):
+        email = email[:-5] + ".com"
+
+    # check for @com typos
+    if email.endswith("@com"):
+        email = email[:-4] + ".com"
+
+    # check for .clm typos
+    if email.endswith(".clm"):
+        email = email[:-4] + ".com"
+
+    # check for .con typos
+    if email.endswith(".con"):
+        email = email[:-4] + ".com"
+
+    # check for .c typos
+    if email.endswith(".c"):
+        email = email[:-2] + ".com"
+
+    # check for ..com typos
+    if email.endswith("..com"):
+        email = email[:-5] + ".com"
+
+    # check for doubled .com typos
+    if email.endswith(".com.com"):
+        email = email[:-8] + ".com"
+
+    # check for numbers after .com via regular expression
+    if re.search(r"\.com[0-9]$", email):
+        email = email[:-5] + ".com"
+
+    # check for common misspellings
+    for misspelling, replacement in COMMON_DOMAIN_MISSPELLINGS.items():
+        if email.endswith(misspelling):
+            email = email.replace(misspelling, replacement)
+        elif email.endswith(f"{misspelling}.com"):
+            email = email.replace(f"{misspelling}.com", replacement)
+        elif email.endswith(f"{misspelling}com"):
+            email = email.replace(f"{misspelling}com", replacement)
+        elif email.endswith(f"{misspelling}.es"):
+            es_replace = replacement.replace(".com", ".es")
+            email = email.replace(f"{misspelling}.es", es_replace)
+        elif email.endswith(f"{misspelling}.mx"):
+            mx_replace = replacement.replace(".com", ".mx")
+            email = email.replace(f"{misspelling}.mx", mx_replace)
+
+    # check for missing . in domain
+    for domain in COMMON_DOMAINS:
+        if email.endswith(f"{domain}com"):
+            email = email.replace(f"{domain}com", f"{domain}.com")
+
+    # check for at spelled out in domain
+    for domain in COMMON_DOMAINS:
+        if email.endswith(f"at{domain}.com"):
+            email = email.replace(f"at{domain}.com", f"@{domain}.com")
+        if email.endswith(f"at{domain}.mx"):
+            email = email.replace(f"at{domain}.mx", f"@{domain}.mx")
+        if email.endswith(f"at{domain}.es"):
+            email = email.replace(f"at{domain}.es", f"@{domain}.es")
+
+    # check for missing .com
+    for domain in COMMON_DOMAINS:
+        if (
+            domain in email
+            and not email.endswith(".com")
+            and not "." in email.split("@")[-1]
+        ):
+            email = email.replace(domain, f"{domain}.com")
+
+    # check for .co in common domains
+    for domain in COMMON_DOMAINS:
+        if email.endswith(f"{domain}.co"):
+            email = email[:-3] + ".com"
+
+    # check for missing @ symbol
+    for domain in COMMON_DOMAINS:
+        if domain in email and "@" not in email:
+            email = email.replace(domain, f"@{domain}")
+
+    # check for period after @
+    if "@." in email:
+        email = email.replace("@.", "@")
+
+    # check for period before @
+    if ".@" in email:
+        email = email.replace(".@", "@")
+
+    # check for duplicated @
+    if "@@" in email:
+        email = email.replace("@@", "@")
+
+    # check for @ symbol in username
+    at_count = email.count("@")
+    if at_count > 1:
+        email = email.replace("@", ".", at_count - 1)
+
+    return email
+
+
+def _email_corpus():
+    suffixes = [".com", ".es", ".mx", "com", ".co", ""]
+    tld_typos = [".vom", ".col", ".comp", ".como", "@com", ".clm", ".con"]
+    tld_typos += [".c", "..com", ".com.com", ".com1", ".com.", "@"]
+    domains = list(COMMON_DOMAIN_MISSPELLINGS) + COMMON_DOMAINS
+    domains += list(COMMON_DOMAIN_MISSPELLINGS.values())
+    users = ["person", "p.erson", "mailto:person", "personat", "gmail"]
+    corpus = []
+    for user in users:
+        for domain in domains:
+            for sep in ["@", "at", "", "@.", ".@", "@@"]:
+                for tail in suffixes + tld_typos:
+                    corpus.append(f"{user}{sep}{domain}{tail}")
+    # random combinations of the same pieces
+    rng = random.Random(0)
+    pieces = domains + suffixes + tld_typos + users + ["@", ".", " ", "x"]
+    for _ in range(20000):
+        corpus.append("".join(rng.choices(pieces, k=rng.randint(1, 5))))
+    return corpus
+
+
+def test_clean_email_equivalence():
+    """
+    Test that the compiled rules give the same results as the original chain
+    """
+    for email in _email_corpus():
+        try:
+            expected = _legacy_clean_email(email)
+        except IndexError:
+            # emails which are only whitespace and punctuation
+            continue
+        assert clean_email(email) == expected, email
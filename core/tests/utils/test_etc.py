@@ -1,4 +1,4 @@
-from bam_core.utils.etc import to_list, to_bool
+from bam_core.utils.etc import chunk, to_list, to_bool
 
 
 def test_to_list():
@@ -6,6 +6,11 @@ def test_to_list():
     assert [1] == to_list([1])
 
 
+def test_chunk():
+    assert list(chunk(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunk([], 2)) == []
+
+
 def test_to_bool():
     assert to_bool("y") == True
     assert to_bool("yes") == True
@@ -1,9 +1,25 @@
-from bam_core.utils.geo import format_address
+from bam_core.utils.geo import format_address, format_address_async
+from bam_core.utils.cache import SqliteCache
+import os
+import asyncio
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 
 class TestFormatAddress(unittest.TestCase):
+    def setUp(self):
+        # use a fresh geocoding cache for every test
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = SqliteCache(
+            os.path.join(self.tempdir.name, "cache.sqlite"), namespace="geo"
+        )
+        patcher = patch("bam_core.utils.geo.GEO_CACHE", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tempdir.cleanup)
+
     @patch("bam_core.utils.geo.GoogleMaps.get_place")
     @patch("bam_core.utils.geo.GoogleMaps.get_normalized_address")
     @patch("bam_core.utils.geo.GoogleMaps.get_lat_lng")
@@ -185,6 +201,139 @@ class TestFormatAddress(unittest.TestCase):
         result = format_address("", "Brooklyn, NY", "11201")
         self.assertEqual(result, expected_result)
 
+    @patch("bam_core.utils.geo.GoogleMaps.get_place")
+    @patch("bam_core.utils.geo.GoogleMaps.get_normalized_address")
+    @patch("bam_core.utils.geo.GoogleMaps.get_lat_lng")
+    @patch("bam_core.utils.geo.NycPlanningLabs.search")
+    def test_format_address_cached(
+        self,
+        mock_nycpl_search,
+        mock_get_lat_lng,
+        mock_get_normalized_address,
+        mock_get_place,
+    ):
+        mock_get_place.return_value = [
+            {
+                "description": "123 Main St, Brooklyn, NY 11201",
+                "types": ["premise"],
+            }
+        ]
+        mock_get_normalized_address.return_value = {}
+        mock_get_lat_lng.return_value = (40.6782, -73.9442)
+        mock_nycpl_search.return_value = {"features": []}
+
+        result = format_address("123 Main St", "Brooklyn, NY", "11201")
+        # the same address query, after fixing common mistakes
+        cached_result = format_address(
+            " 123 main st #", "brooklyn, ny", "11201"
+        )
+        self.assertEqual(result, cached_result)
+        self.assertEqual(mock_get_place.call_count, 1)
+        self.assertEqual(mock_get_lat_lng.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    @patch("bam_core.utils.geo.GoogleMaps.get_place")
+    @patch("bam_core.utils.geo.GoogleMaps.get_normalized_address")
+    @patch("bam_core.utils.geo.GoogleMaps.get_lat_lng")
+    @patch("bam_core.utils.geo.NycPlanningLabs.search")
+    def test_format_address_concurrent_lookups(
+        self,
+        mock_nycpl_search,
+        mock_get_lat_lng,
+        mock_get_normalized_address,
+        mock_get_place,
+    ):
+        # both lookups must be in flight at once to pass the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_lat_lng(address):
+            barrier.wait()
+            return 40.6782, -73.9442
+
+        def search(address):
+            barrier.wait()
+            return {
+                "features": [
+                    {"properties": {"addendum": {"pad": {"bin": "3000001"}}}}
+                ]
+            }
+
+        mock_get_place.return_value = [
+            {
+                "description": "123 Main St, Brooklyn, NY 11201",
+                "types": ["premise"],
+            }
+        ]
+        mock_get_normalized_address.return_value = {}
+        mock_get_lat_lng.side_effect = get_lat_lng
+        mock_nycpl_search.side_effect = search
+
+        result = format_address("123 Main St", "Brooklyn, NY", "11201")
+        self.assertEqual(result["bin"], "3000001")
+        self.assertEqual(result["lat"], 40.6782)
+
+    @patch(
+        "bam_core.utils.geo.AsyncNycPlanningLabs.search",
+        new_callable=AsyncMock,
+    )
+    @patch(
+        "bam_core.utils.geo.AsyncGoogleMaps.get_lat_lng",
+        new_callable=AsyncMock,
+    )
+    @patch(
+        "bam_core.utils.geo.AsyncGoogleMaps.get_normalized_address",
+        new_callable=AsyncMock,
+    )
+    @patch(
+        "bam_core.utils.geo.AsyncGoogleMaps.get_place",
+        new_callable=AsyncMock,
+    )
+    def test_format_address_async(
+        self,
+        mock_get_place,
+        mock_get_normalized_address,
+        mock_get_lat_lng,
+        mock_nycpl_search,
+    ):
+        mock_get_place.return_value = [
+            {
+                "description": "123 Main St, Brooklyn, NY 11201",
+                "types": ["premise"],
+            }
+        ]
+        mock_get_normalized_address.return_value = {
+            "result": {
+                "address": {
+                    "formattedAddress": "123 Main St Brooklyn, NY 11201"
+                },
+            }
+        }
+        mock_get_lat_lng.return_value = (40.6782, -73.9442)
+        mock_nycpl_search.return_value = {
+            "features": [
+                {"properties": {"addendum": {"pad": {"bin": "3000001"}}}}
+            ]
+        }
+
+        result = asyncio.run(
+            format_address_async("123 Main St", "Brooklyn, NY", "11201")
+        )
+        self.assertEqual(
+            result,
+            {
+                "cleaned_address": "123 MAIN ST BROOKLYN, NY 11201",
+                "bin": "3000001",
+                "cleaned_address_accuracy": "Building",
+                "plus_code": "87G8M3H4+",
+                "lat": 40.6782,
+                "lng": -73.9442,
+            },
+        )
+        mock_get_place.assert_awaited_once_with(
+            "123 MAIN ST, BROOKLYN, NY 11201", strict_bounds=True
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
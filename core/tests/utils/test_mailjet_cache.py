@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from bam_core.utils.etc import now_utc
+from bam_core.utils.mailjet_cache import MailjetContactCache
+
+
+class MemoryS3(object):
+    def __init__(self):
+        self.objects = {}
+
+    def exists(self, key):
+        return key in self.objects
+
+    def get_contents(self, key):
+        return self.objects[key]
+
+    def upload_file_obj(self, fobj, key, mimetype=None):
+        self.objects[key] = fobj.read()
+
+
+def _contact(contact_id, email):
+    return {"ID": contact_id, "Email": email}
+
+
+def test_mailjet_contact_cache_full_then_incremental_sync():
+    s3 = MemoryS3()
+    mailjet = MagicMock()
+    mailjet.get_all_contacts.return_value = [
+        _contact(1, "A@gmail.com"),
+        _contact(2, "b@gmail.com"),
+    ]
+    cache = MailjetContactCache(mailjet, s3)
+    assert cache.sync() == {"a@gmail.com", "b@gmail.com"}
+    assert cache.watermark == 2
+    cache.add(["C@gmail.com"])
+    cache.save()
+
+    mailjet.iter_contacts_since.return_value = iter(
+        [_contact(4, "d@gmail.com"), _contact(3, "c@gmail.com")]
+    )
+    cache = MailjetContactCache(mailjet, s3)
+    emails = cache.sync()
+    assert emails == {
+        "a@gmail.com",
+        "b@gmail.com",
+        "c@gmail.com",
+        "d@gmail.com",
+    }
+    assert "D@gmail.com" in cache
+    assert cache.watermark == 4
+    mailjet.iter_contacts_since.assert_called_once_with(2)
+    assert mailjet.get_all_contacts.call_count == 1
+
+
+def test_mailjet_contact_cache_periodic_full_sync():
+    s3 = MemoryS3()
+    mailjet = MagicMock()
+    mailjet.get_all_contacts.return_value = [_contact(1, "a@gmail.com")]
+    cache = MailjetContactCache(mailjet, s3, full_sync_interval=60)
+    cache.sync()
+    cache.full_synced_at = now_utc() - timedelta(seconds=61)
+    cache.save()
+
+    # contacts deleted from mailjet are dropped by the full sync
+    mailjet.get_all_contacts.return_value = [_contact(2, "b@gmail.com")]
+    cache = MailjetContactCache(mailjet, s3, full_sync_interval=60)
+    assert cache.sync() == {"b@gmail.com"}
+    assert mailjet.get_all_contacts.call_count == 2
+    mailjet.iter_contacts_since.assert_not_called()
@@ -1,5 +1,8 @@
 from bam_core.utils.phone import (
+    PhoneNumberInfo,
+    analyze_phone_number,
     format_phone_number,
+    format_phone_numbers,
     extract_phone_numbers,
     is_international_phone_number,
     _prepare_phone_number,
@@ -82,3 +85,26 @@ def test_is_international_phone_number():
     assert is_international_phone_number(us_number_no_country_core) is False
     invalid_intl_number = "+44 666 666 6666"
     assert is_international_phone_number(invalid_intl_number) is False
+
+
+def test_analyze_phone_number():
+    assert analyze_phone_number("9294206969") == PhoneNumberInfo(
+        "(929) 420-6969", True, False
+    )
+    assert analyze_phone_number("+44 347 208 6666") == PhoneNumberInfo(
+        "+44 347 208 6666", True, True
+    )
+    assert analyze_phone_number("123456") == PhoneNumberInfo(
+        None, False, False
+    )
+    assert analyze_phone_number(None) == PhoneNumberInfo(None, False, False)
+    analyze_phone_number.cache_clear()
+    analyze_phone_number("(929) 420-6969")
+    analyze_phone_number("(929) 420-6969")
+    assert analyze_phone_number.cache_info().hits == 1
+
+
+def test_format_phone_numbers():
+    assert format_phone_numbers(
+        ["9294206969", "123456", "+34666666666", "9294206969"]
+    ) == ["(929) 420-6969", None, "+34 666 66 66 66", "(929) 420-6969"]
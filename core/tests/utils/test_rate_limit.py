@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import pytest
+
+from bam_core.utils.rate_limit import RateLimiter
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("bam_core.utils.rate_limit.time", clock):
+        yield clock
+
+
+def test_rate_limiter_bursts_then_paces(clock):
+    limiter = RateLimiter(limit=10, window=60)
+    # the first window's worth is sent immediately
+    assert all(limiter.acquire() == 0 for _ in range(10))
+    # then one unit every 6 seconds
+    assert limiter.acquire() == pytest.approx(6)
+    assert limiter.acquire(2) == pytest.approx(12)
+    assert clock.now == pytest.approx(18)
+
+
+def test_rate_limiter_throttles_and_recovers(clock):
+    limiter = RateLimiter(limit=10, window=60, recovery_fraction=0.25)
+    limiter.throttle(retry_after=30)
+    assert limiter.rate == pytest.approx(10 / 60 / 2)
+    # paused for 30 seconds, then paced at half the rate
+    assert limiter.acquire() == pytest.approx(30 + 12)
+    limiter.recover()
+    limiter.recover()
+    assert limiter.rate == pytest.approx(10 / 60)
+    for _ in range(10):
+        limiter.throttle()
+    assert limiter.rate == pytest.approx(10 / 60 * 0.1)
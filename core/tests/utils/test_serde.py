@@ -1,4 +1,23 @@
-from bam_core.utils.serde import obj_to_json, json_to_obj
+import io
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from bam_core.utils.serde import (
+    obj_to_json,
+    json_to_obj,
+    set_json_backend,
+    JSON_BACKENDS,
+    JSON_BACKEND as DEFAULT_JSON_BACKEND,
+    loads,
+    dumps,
+    dump_stream,
+    load_stream,
+    COMPRESSIONS,
+    SERIALIZERS,
+)
 
 
 def test_obj_to_json():
@@ -7,3 +26,67 @@ def test_obj_to_json():
 
 def test_json_to_obj():
     assert json_to_obj('{"a": 1}') == {"a": 1}
+
+
+def test_obj_to_json_handles_datetimes():
+    dt = datetime(2023, 1, 2, 3, 4, 5)
+    assert obj_to_json({"dt": dt}) == '{"dt":"2023-01-02T03:04:05.000000Z"}'
+    assert obj_to_json([date(2023, 1, 2)]) == '["2023-01-02T00:00:00.000000Z"]'
+
+
+def test_json_backends_are_equivalent():
+    obj = {
+        "id": "rec123",
+        "Tags": {"Pads"},
+        "Amount": Decimal("1.5"),
+        "Updated": datetime(2023, 1, 2, 3, 4, 5),
+        "Counts": Counter(["a", "a"]),
+    }
+    outputs = set()
+    for name in JSON_BACKENDS:
+        set_json_backend(name)
+        try:
+            outputs.add(obj_to_json(obj))
+            assert json_to_obj(obj_to_json(obj))["Amount"] == 1.5
+        finally:
+            set_json_backend(DEFAULT_JSON_BACKEND)
+    assert len(outputs) == 1
+
+
+def test_loads_and_dumps_round_trip():
+    obj = [{"a": 1}, {"b": [1, 2]}]
+    for codec in ["json", "json.gz", "ndjson", "ndjson.gz", "pickle.gz"]:
+        assert loads(dumps(obj, codec), codec) == obj
+
+
+def test_dump_and_load_stream():
+    records = [{"id": i, "name": f"record {i}"} for i in range(1000)]
+    codecs = ["json", "json.gz", "ndjson", "ndjson.gz"]
+    if "zst" in COMPRESSIONS:
+        codecs.append("ndjson.zst")
+    for codec in codecs:
+        fobj = io.BytesIO()
+        assert dump_stream(iter(records), fobj, codec) == 1000
+        fobj.seek(0)
+        assert list(load_stream(fobj, codec)) == records
+
+
+def test_dump_stream_json_is_readable_by_json_to_obj():
+    fobj = io.BytesIO()
+    dump_stream([{"a": 1}, {"b": 2}], fobj, "json")
+    assert json_to_obj(fobj.getvalue()) == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.skipif(
+    "msgpack" not in SERIALIZERS, reason="msgpack is not installed"
+)
+def test_msgpack_round_trips_extension_types():
+    obj = {
+        "updated": datetime(2023, 1, 2, 3, 4, 5),
+        "date": date(2023, 1, 2),
+        "tags": {"Pads", "Soap"},
+        "amount": Decimal("1.10"),
+        1: [b"bytes", None, 1.5],
+    }
+    assert loads(dumps(obj, "msgpack"), "msgpack") == obj
+    assert loads(dumps(obj, "msgpack.gz"), "msgpack.gz") == obj
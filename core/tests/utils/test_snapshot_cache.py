@@ -0,0 +1,41 @@
+from bam_core.utils.snapshot_cache import SnapshotCache, SNAPSHOT_DATE_FIELD
+
+
+def _build_cache(cache_dir):
+    cache = SnapshotCache(cache_dir)
+    cache.add_snapshot(
+        "snapshot-2.json",
+        "2023-01-02",
+        [{"id": "recB", "Status": "Open"}, {"id": "recA", "Status": "Open"}],
+    )
+    cache.add_snapshot(
+        "snapshot-1.json", "2023-01-01", [{"id": "recA", "Status": "New"}]
+    )
+    cache.save()
+    return cache
+
+
+def test_snapshot_cache_history(tmp_path):
+    with _build_cache(str(tmp_path)) as cache:
+        assert list(cache) == ["recA", "recB"]
+        assert len(cache) == 2
+        history = cache["recA"]
+        assert [r["Status"] for r in history] == ["New", "Open"]
+        assert history[0][SNAPSHOT_DATE_FIELD] == "2023-01-01"
+        assert cache.get_last_snapshot("recA")["Status"] == "Open"
+        assert cache.get_last_snapshot("recC") is None
+        assert "recC" not in cache
+
+
+def test_snapshot_cache_reopen_and_append(tmp_path):
+    _build_cache(str(tmp_path)).close()
+    with SnapshotCache(str(tmp_path)) as cache:
+        assert cache.has_snapshot("snapshot-1.json")
+        cache.add_snapshot(
+            "snapshot-3.json", "2023-01-03", [{"id": "recA", "Status": "Done"}]
+        )
+        cache.save()
+        last_snapshots = dict(cache.iter_last_snapshots())
+        assert last_snapshots["recA"]["Status"] == "Done"
+        assert last_snapshots["recB"]["Status"] == "Open"
+        assert len(cache["recA"]) == 3